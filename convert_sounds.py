@@ -0,0 +1,183 @@
+"""
+Convert sound sources (mp3, ogg, flac) to normalized wav files, in parallel. Files whose source did not change since
+their last conversion are skipped. Optionally, lighter variants of sfx (mono and/or downsampled) are written in
+another folder, which can be used as ``sfx_sound_folder``. The sound manifest is updated with the new files.
+Existing wav files that were not written by this script are kept, unless ``--force`` is given.
+
+Usage:
+    python convert_sounds.py [--folder data/sound/] [--workers 4] [--sfx-variant-folder data/sound/sfx_light/] [--force]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from pydub import AudioSegment, effects
+
+from engine.sound.sound_manifest import SoundManifest
+from engine.utils.ini_parser import ParamUtils
+
+logging.basicConfig(level='INFO')
+
+SOURCE_FORMATS = ('.mp3', '.ogg', '.flac', '.m4a')
+
+
+def read_params() -> dict:
+    """
+    Read default parameters, overridden by the custom parameter file if it exists
+    """
+    params = ParamUtils.read_ini_file('params_default.ini')
+    if Path('params.ini').exists():
+        params.update(ParamUtils.read_ini_file('params.ini'))
+    return params
+
+
+def file_hash(path: str, settings: dict) -> str:
+    """
+    Hash of a file content together with the conversion settings
+    """
+    h = hashlib.sha1(json.dumps(settings, sort_keys=True).encode())
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(2 ** 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def convert(source: str, target: str, sample_rate: int = None, channels: int = None, normalize: bool = True,
+            headroom: float = 1.0) -> str:
+    """
+    Convert a sound file to a 16 bits wav file. Executed in a worker process
+
+    Args:
+        source (str): the source file, in any format supported by ffmpeg
+        target (str): the wav file to write
+        sample_rate (:obj:`int`, optional): sample rate of the wav file. Default is the source one
+        channels (:obj:`int`, optional): number of channels of the wav file. Default is the source one
+        normalize (bool): normalize the volume
+        headroom (float): headroom of the normalization, in dB
+
+    Returns:
+        the target file
+    """
+    sound = AudioSegment.from_file(source)
+    if normalize:
+        sound = effects.normalize(sound, headroom=headroom)
+    if sample_rate is not None:
+        sound = sound.set_frame_rate(sample_rate)
+    if channels is not None:
+        sound = sound.set_channels(channels)
+    sound = sound.set_sample_width(2)
+
+    # write in a temporary file first, so that an interrupted conversion is not seen as done
+    tmp = target + '.tmp'
+    sound.export(tmp, format='wav')
+    os.replace(tmp, target)
+    return target
+
+
+def list_jobs(args) -> list:
+    """
+    List all conversions to perform, as tuples of source file, target file and settings
+    """
+    jobs = []
+    for root, _, files in os.walk(args.folder):
+        if args.sfx_variant_folder is not None and Path(root) == Path(args.sfx_variant_folder):
+            continue
+        for file in sorted(files):
+            if file.lower().endswith(SOURCE_FORMATS):
+                settings = {'sample_rate': args.sample_rate, 'channels': None, 'normalize': not args.no_normalize}
+                jobs.append((os.path.join(root, file), os.path.join(root, Path(file).stem + '.wav'), settings))
+    return jobs
+
+
+def list_variant_jobs(args, params) -> list:
+    """
+    List all conversions of sfx to their light variants
+    """
+    jobs = []
+    if args.sfx_variant_folder is None:
+        return jobs
+    os.makedirs(args.sfx_variant_folder, exist_ok=True)
+    sfx_folder = params['sfx_sound_folder']
+    settings = {'sample_rate': args.variant_sample_rate, 'channels': 1 if args.mono else None, 'normalize': False}
+    for file in sorted(os.listdir(sfx_folder)):
+        if file.endswith('.wav'):
+            jobs.append((os.path.join(sfx_folder, file), os.path.join(args.sfx_variant_folder, file), settings))
+    return jobs
+
+
+def run(jobs: list, cache: dict, workers: int, force: bool = False) -> list:
+    """
+    Run the conversions whose source or settings changed, in a process pool. Existing targets missing from the cache
+    were not written by a previous conversion, they are kept unless ``force`` is set
+
+    Returns:
+        the written files
+    """
+    todo = []
+    kept = 0
+    for source, target, settings in jobs:
+        if not force and target not in cache and os.path.exists(target):
+            logging.warning(f'"{target}" exists and was not converted by this script, use --force to replace it')
+            kept += 1
+            continue
+        h = file_hash(source, settings)
+        if cache.get(target, None) == h and os.path.exists(target):
+            continue
+        todo.append((source, target, settings, h))
+    logging.info(f'{len(todo)} files to convert, {len(jobs) - len(todo) - kept} up to date, {kept} kept')
+
+    written = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(convert, source, target, **settings): (source, target, h)
+                   for source, target, settings, h in todo}
+        for future in as_completed(futures):
+            source, target, h = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                logging.error(f'cannot convert "{source}": {e}')
+                continue
+            logging.info(f'"{source}" converted to "{target}"')
+            cache[target] = h
+            written.append(target)
+    return written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert sound sources to wav files')
+    parser.add_argument('--folder', default='data/sound/', help='folder of sound sources, searched recursively')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--sample-rate', type=int, default=None, help='sample rate of converted files')
+    parser.add_argument('--no-normalize', action='store_true', help='do not normalize volumes')
+    parser.add_argument('--sfx-variant-folder', default=None, help='folder of light sfx variants, if any')
+    parser.add_argument('--variant-sample-rate', type=int, default=22050, help='sample rate of sfx variants')
+    parser.add_argument('--mono', action='store_true', help='sfx variants are mono')
+    parser.add_argument('--cache', default='data/sound/conversion_cache.json', help='hashes of converted files')
+    parser.add_argument('--force', action='store_true', help='replace existing wav files missing from the cache')
+    args = parser.parse_args()
+    params = read_params()
+
+    cache = dict()
+    if os.path.exists(args.cache):
+        with open(args.cache, 'r') as f:
+            cache = json.load(f)
+
+    # sources first, since sfx variants may be made from converted sources
+    written = run(list_jobs(args), cache, args.workers, args.force)
+    written += run(list_variant_jobs(args, params), cache, args.workers, args.force)
+
+    with open(args.cache, 'w') as f:
+        json.dump(cache, f, indent=1)
+
+    # update durations of sounds
+    manifest = SoundManifest(params['sound_manifest_file'])
+    for folder in [params['sfx_sound_folder'], params['music_sound_folder'], params['ambient_sound_folder'],
+                   args.sfx_variant_folder]:
+        if folder is not None and os.path.isdir(folder):
+            manifest.scan(folder)
+    manifest.save()
+    logging.info(f'all done, {len(written)} files written')
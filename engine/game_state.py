@@ -22,7 +22,9 @@ class GameState(DirectObject):
     state_type: StateType
     led_id: Optional[str] = None
     power: Optional[float] = 0.0
+    # led id of led states, hardware inputs are bound to states in the hardware file
     hardware_key: Optional[str] = None
+    animation: Optional[str] = None
     _value: Optional[Any] = None
 
     def __post_init__(self):
@@ -31,10 +33,10 @@ class GameState(DirectObject):
             self.led_id = self.hardware_key
             self.hardware_key = None
 
-        if self.hardware_key is not None:
-            self.accept(self.hardware_key, self._set_value_from_hardware)
-
-    def _set_value_from_hardware(self, value) -> None:
+    def set_value_from_hardware(self, value) -> None:
+        """
+        Set the value from a hardware input. Called by the :class:`HardwareHandler` dispatch table
+        """
         # if we are a switch, we always receive "True"
         # so we need to reverse the value
         # "new_value" itself is ignored
@@ -67,17 +69,23 @@ class GameState(DirectObject):
 
     def set_led_on(self) -> None:
         """
-        Set corresponding led on if it exist and is valid
+        Set corresponding led on if it exist and is valid. If the state has an animation, the led is animated instead
         """
         if self.led_id is not None: # and self.led_id.isdigit():
-            self.engine.hardware.switch_led_on(self.led_id)
+            if self.animation is not None:
+                self.engine.hardware.animate_leds(self.led_id, [self.led_id], pattern=self.animation)
+            else:
+                self.engine.hardware.switch_led_on(self.led_id)
 
     def set_led_off(self) -> None:
         """
         Set corresponding led on if it exist and is valid
         """
         if self.led_id is not None:# and self.led_id.isdigit():
-            self.engine.hardware.switch_led_off(self.led_id)
+            if self.engine.hardware.is_led_animated(self.led_id):
+                self.engine.hardware.stop_led_animation(self.led_id, value=False)
+            else:
+                self.engine.hardware.switch_led_off(self.led_id)
 
     def set_value(self, new_value: Any,
                   update_power: bool = True,
@@ -167,28 +175,28 @@ class GameStateManager:
     full_pilote_automatique = GameState(True, StateType.SOFTWARE)
 
     # buttons
-    admin = GameState(False, StateType.BUTTON, hardware_key='joystick1-button6')
-    freq_moins = GameState(False, StateType.BUTTON, hardware_key='joystick1-button4')
-    freq_plus = GameState(False, StateType.BUTTON, hardware_key='joystick1-button3')
+    admin = GameState(False, StateType.BUTTON)
+    freq_moins = GameState(False, StateType.BUTTON)
+    freq_plus = GameState(False, StateType.BUTTON)
 
     # joysticks
     copilote_h = GameState(False, StateType.JOYSTICK)
     copilote_v = GameState(False, StateType.JOYSTICK)
     pilote_h = GameState(False, StateType.JOYSTICK)
-    sp_orientation_h = GameState(False, StateType.JOYSTICK, hardware_key='joystick2-axis0')
-    sp_orientation_v = GameState(False, StateType.JOYSTICK, hardware_key='joystick2-axis1')
+    sp_orientation_h = GameState(False, StateType.JOYSTICK)
+    sp_orientation_v = GameState(False, StateType.JOYSTICK)
 
     # leds
-    problem0 = GameState(False, StateType.LED, hardware_key='0')
-    problem1 = GameState(False, StateType.LED, hardware_key='1')
-    problem2 = GameState(False, StateType.LED, hardware_key='2')
+    problem0 = GameState(False, StateType.LED, hardware_key='0', animation='blink')
+    problem1 = GameState(False, StateType.LED, hardware_key='1', animation='blink')
+    problem2 = GameState(False, StateType.LED, hardware_key='2', animation='blink')
     ps_nominal = GameState(True, StateType.LED, hardware_key='31')
     defficience_moteur1 = GameState(False, StateType.LED, hardware_key='14')
     defficience_moteur2 = GameState(False, StateType.LED, hardware_key='13')
     defficience_moteur3 = GameState(False, StateType.LED, hardware_key='10')
     main_O2_up = GameState(False, StateType.LED, hardware_key='23')
     main_O2_down = GameState(False, StateType.LED, hardware_key='26')
-    main_O2_low = GameState(False, StateType.LED, hardware_key='29')
+    main_O2_low = GameState(False, StateType.LED, hardware_key='29', animation='pulse')
     main_power_up = GameState(False, StateType.LED, hardware_key='24')
     main_power_down = GameState(False, StateType.LED, hardware_key='27')
     main_power_low = GameState(False, StateType.LED, hardware_key='30')
@@ -201,38 +209,38 @@ class GameStateManager:
     surpression3 = GameState(False, StateType.LED)
     fuite_O2 = GameState(False, StateType.LED, hardware_key='6')
     fuite_CO2 = GameState(False, StateType.LED, hardware_key='3')
-    alert0 = GameState(False, StateType.LED, hardware_key='54')
-    alert1 = GameState(False, StateType.LED, hardware_key='55')
+    alert0 = GameState(False, StateType.LED, hardware_key='54', animation='blink')
+    alert1 = GameState(False, StateType.LED, hardware_key='55', animation='blink')
     acceleration = GameState(False, StateType.LED)
 
     # switches
-    batterie1 = GameState(False, StateType.SWITCH, hardware_key='joystick0-button0', led_id='33', power=20)
-    batterie2 = GameState(False, StateType.SWITCH, hardware_key='joystick0-button1', led_id='34', power=20)
-    batterie3 = GameState(False, StateType.SWITCH, hardware_key='joystick0-button2', led_id='35', power=20)
-    batterie4 = GameState(False, StateType.SWITCH, hardware_key='joystick0-button9', led_id='36', power=20)
-    batteries = GameState(False, StateType.SWITCH, hardware_key='joystick0-button3', power=5)
-    correction_direction = GameState(True, StateType.SWITCH, hardware_key='joystick1-button1', led_id='19')
-    correction_roulis = GameState(True, StateType.SWITCH, hardware_key='joystick1-button2', led_id='18')
-    correction_stabilisation = GameState(True, StateType.SWITCH, hardware_key='joystick1-button0', led_id='20')
-    moteur1 = GameState(True, StateType.SWITCH, hardware_key='joystick0-button6', led_id='17', power=100)
-    moteur2 = GameState(True, StateType.SWITCH, hardware_key='joystick0-button7', led_id='15', power=100)
-    moteur3 = GameState(True, StateType.SWITCH, hardware_key='joystick0-button4', led_id='16', power=100)
-    oxygene_secteur1 = GameState(True, StateType.SWITCH, hardware_key='joystick1-button8', led_id='37', power=-20)
-    oxygene_secteur2 = GameState(True, StateType.SWITCH, hardware_key='joystick2-button0', led_id='38', power=-20)
-    oxygene_secteur3 = GameState(True, StateType.SWITCH, hardware_key='joystick1-button9', led_id='39', power=-20)
-    pilote_automatique1 = GameState(True, StateType.SWITCH, hardware_key='joystick0-button5')
-    pilote_automatique2 = GameState(True, StateType.SWITCH, hardware_key='joystick1-button7')
-    recyclage_CO2 = GameState(True, StateType.SWITCH, hardware_key='joystick2-button7', led_id='48', power=-20)
-    recyclage_H2O = GameState(True, StateType.SWITCH, hardware_key='joystick2-button8', led_id='47', power=-20)
-    recyclage_O2 = GameState(True, StateType.SWITCH, hardware_key='joystick2-button9', led_id='46', power=-20)
-    tension_secteur1 = GameState(True, StateType.SWITCH, hardware_key='joystick2-button1', led_id='40', power=-20)
-    tension_secteur2 = GameState(True, StateType.SWITCH, hardware_key='joystick2-button2', led_id='41', power=-20)
-    tension_secteur3 = GameState(True, StateType.SWITCH, hardware_key='joystick2-button3', led_id='42', power=-20)
-    thermique_secteur1 = GameState(True, StateType.SWITCH, hardware_key='joystick2-button4', led_id='43', power=-20)
-    thermique_secteur2 = GameState(True, StateType.SWITCH, hardware_key='joystick2-button5', led_id='44', power=-20)
-    thermique_secteur3 = GameState(True, StateType.SWITCH, hardware_key='joystick2-button6', led_id='45', power=-20)
-    verrouillage_secteur1 = GameState(True, StateType.SWITCH, hardware_key='joystick2-button6', led_id='4')
-    verrouillage_secteur2 = GameState(True, StateType.SWITCH, hardware_key='joystick2-button6', led_id='5')
-    verrouillage_secteur3 = GameState(True, StateType.SWITCH, hardware_key='joystick2-button6', led_id='11')
-    joystick_pilote = GameState(0, StateType.SWITCH, hardware_key='joystick0-button4')
-    joystick_copilote = GameState(0, StateType.SWITCH, hardware_key='joystick1-button5')
+    batterie1 = GameState(False, StateType.SWITCH, led_id='33', power=20)
+    batterie2 = GameState(False, StateType.SWITCH, led_id='34', power=20)
+    batterie3 = GameState(False, StateType.SWITCH, led_id='35', power=20)
+    batterie4 = GameState(False, StateType.SWITCH, led_id='36', power=20)
+    batteries = GameState(False, StateType.SWITCH, power=5)
+    correction_direction = GameState(True, StateType.SWITCH, led_id='19')
+    correction_roulis = GameState(True, StateType.SWITCH, led_id='18')
+    correction_stabilisation = GameState(True, StateType.SWITCH, led_id='20')
+    moteur1 = GameState(True, StateType.SWITCH, led_id='17', power=100)
+    moteur2 = GameState(True, StateType.SWITCH, led_id='15', power=100)
+    moteur3 = GameState(True, StateType.SWITCH, led_id='16', power=100)
+    oxygene_secteur1 = GameState(True, StateType.SWITCH, led_id='37', power=-20)
+    oxygene_secteur2 = GameState(True, StateType.SWITCH, led_id='38', power=-20)
+    oxygene_secteur3 = GameState(True, StateType.SWITCH, led_id='39', power=-20)
+    pilote_automatique1 = GameState(True, StateType.SWITCH)
+    pilote_automatique2 = GameState(True, StateType.SWITCH)
+    recyclage_CO2 = GameState(True, StateType.SWITCH, led_id='48', power=-20)
+    recyclage_H2O = GameState(True, StateType.SWITCH, led_id='47', power=-20)
+    recyclage_O2 = GameState(True, StateType.SWITCH, led_id='46', power=-20)
+    tension_secteur1 = GameState(True, StateType.SWITCH, led_id='40', power=-20)
+    tension_secteur2 = GameState(True, StateType.SWITCH, led_id='41', power=-20)
+    tension_secteur3 = GameState(True, StateType.SWITCH, led_id='42', power=-20)
+    thermique_secteur1 = GameState(True, StateType.SWITCH, led_id='43', power=-20)
+    thermique_secteur2 = GameState(True, StateType.SWITCH, led_id='44', power=-20)
+    thermique_secteur3 = GameState(True, StateType.SWITCH, led_id='45', power=-20)
+    verrouillage_secteur1 = GameState(True, StateType.SWITCH, led_id='4')
+    verrouillage_secteur2 = GameState(True, StateType.SWITCH, led_id='5')
+    verrouillage_secteur3 = GameState(True, StateType.SWITCH, led_id='11')
+    joystick_pilote = GameState(0, StateType.SWITCH)
+    joystick_copilote = GameState(0, StateType.SWITCH)
@@ -0,0 +1,91 @@
+import glob
+import os
+from typing import Dict, Iterable, Optional
+
+from panda3d.core import TextNode
+
+from engine.utils.logger import Logger
+
+
+class FontManager:
+    """
+    Loads each font once, and rasterizes in advance the glyphs of texts that will be displayed, so that showing a new
+    text does not cause a hitch
+    """
+    def __init__(self, engine):
+        """
+        Args:
+            engine: the main engine
+        """
+        self._engine = engine
+        self._fonts: Dict[str, object] = dict()
+
+    def get(self, name: str, pixels_per_unit: Optional[float] = None):
+        """
+        Get a font, loaded on first use
+
+        Args:
+            name (str): the font file, in the font folder
+            pixels_per_unit (:obj:`float`, optional): the resolution of glyphs, set when the font is loaded
+
+        Returns:
+            the font
+        """
+        if name not in self._fonts:
+            font = self._engine.loader.load_font(os.path.join(self._engine.get_option('font_path'), name))
+            if pixels_per_unit is not None:
+                font.setPixelsPerUnit(pixels_per_unit)
+            self._fonts[name] = font
+        return self._fonts[name]
+
+    def prewarm(self, texts: Iterable[str]) -> None:
+        """
+        Rasterize the glyphs of all characters of some texts, in all loaded fonts
+
+        Args:
+            texts: the texts
+        """
+        chars = set()
+        for text in texts:
+            chars.update(text)
+        # control characters are not displayed (e.g. text property markers)
+        chars = ''.join(sorted(c for c in chars if ord(c) >= 32))
+
+        node = TextNode('prewarm')
+        for font in self._fonts.values():
+            node.set_font(font)
+            node.set_text(chars)
+            node.generate()
+        Logger.info(f'{len(chars)} characters rasterized in {len(self._fonts)} fonts')
+
+    def prewarm_game_texts(self, texts: Iterable[str]) -> None:
+        """
+        Rasterize the glyphs of the given texts and of all scenarios
+
+        Args:
+            texts: the texts of the active language
+        """
+        texts = list(texts)
+        for file_name in glob.glob(os.path.join(self._engine.get_option('scenario_path'), '*.xml')):
+            with open(file_name, 'r', encoding='utf-8') as file:
+                texts.append(file.read())
+        self.prewarm(texts)
+        self.log_memory()
+
+    def memory(self) -> int:
+        """
+        Memory used by glyph pages of all fonts, in bytes
+        """
+        size = 0
+        for font in self._fonts.values():
+            if hasattr(font, 'get_num_pages'):
+                for i in range(font.get_num_pages()):
+                    size += font.get_page(i).get_expected_ram_image_size()
+        return size
+
+    def log_memory(self) -> None:
+        """
+        Log the number of glyph pages and the memory they use
+        """
+        pages = sum(font.get_num_pages() for font in self._fonts.values() if hasattr(font, 'get_num_pages'))
+        Logger.info(f'fonts: {len(self._fonts)} loaded, {pages} glyph pages using {self.memory() / 2 ** 20:.1f} MB')
@@ -1,12 +1,18 @@
+import csv
 import math
 import os
 import re
-import pandas as pd
+from collections import OrderedDict
+from typing import Dict
+
 from direct.gui.OnscreenText import WindowProperties
 
 from engine.gui.main_screens.main_screen import MainScreen
 from engine.gui.main_screens.got_to_mars_screen import GoToMarsScreen
 from engine.gui.main_screens.lost_astronaut_screen import LostAstronautScreen
+from engine.gui.font_manager import FontManager
+from engine.gui.gui_buffer import GuiBuffer
+from engine.gui.texture_cache import TextureCache
 from engine.gui.utils import build_text_properties
 from engine.gui.widgets.button import Button
 from engine.gui.windows.button_window import ButtonWindow
@@ -23,6 +29,8 @@ class Gui(EventObject):
     Class that represents the [old]ControlScreen that must be unlocked.
     Displayed on the control screen
     """
+    # maximum number of processed texts kept in memory
+    _max_processed_texts = 2048
     colors = {
         'green': (0.2, 0.8, 0.1, 1.0),
         'red': (0.8, 0.2, 0.1, 1.0),
@@ -41,22 +49,66 @@ class Gui(EventObject):
         'background': (0.08, 0.08, 0.08, 1.0),
         'terminal_bg': (0.174, 0.036, 0.11, 1.0),
     }
+    _text_escapes = {'1': '\1', '2': '\2', 'n': '\n', 't': '\t'}
+    _text_escapes_regex = re.compile(r'\\([12nt])')
 
     def __init__(self, engine):
         super().__init__()
 
         self.engine = engine
         self._current_window = None
+        # released windows that can be reused, by pool key
+        self._window_pool = dict()
+        # offscreen rendering of the gui, if its refresh is limited
+        self._gui_buffer = None
 
         # build text properties
-        build_text_properties(engine)
+        self.fonts = FontManager(engine)
+        build_text_properties(engine, self.fonts)
+        self.fonts.get(self.engine.get_option('terminal_font'))
+
+        self.textures = TextureCache(engine)
+        self.textures.preload_icons(set(TextureCache.default_icons) | self.textures.scenario_icons())
 
         self.image_path = self.engine.get_option("control_screen_image_path")
 
         # read text correspondence
-        self._text_file = pd.read_csv(self.engine.get_option('text_file'), sep=';', index_col='key').fillna('NaN')
+        self._texts = self.read_texts(self.engine.get_option('text_file'))
+        # last processed texts, by text, language and key
+        self._processed_texts: OrderedDict = OrderedDict()
+        self._text_regexes = dict()
         self.screen = None
 
+        if self.engine.get_option('prewarm_glyphs'):
+            self.fonts.prewarm_game_texts(self._texts.get(self.engine.get_option('lang'), dict()).values())
+
+    @staticmethod
+    def read_texts(file_name: str) -> Dict[str, Dict[str, str]]:
+        """
+        Read the text file and compile it in one dictionary per language. Escaped characters are replaced
+
+        Args:
+            file_name (str): the csv text file, with a ``key`` column and one column per language
+
+        Returns:
+            a :obj:`dict` from languages to dictionaries from text keys to texts
+        """
+        texts = dict()
+        with open(file_name, 'r', encoding='utf-8', newline='') as file:
+            reader = csv.DictReader(file, delimiter=';')
+            for lang in reader.fieldnames:
+                if lang != 'key':
+                    texts[lang] = dict()
+            for row in reader:
+                key = row.pop('key', None)
+                if not key:
+                    continue
+                for lang, value in row.items():
+                    # empty or missing texts are not stored
+                    if lang in texts and value and value != 'NaN' and key not in texts[lang]:
+                        texts[lang][key] = Gui._text_escapes_regex.sub(lambda m: Gui._text_escapes[m.group(1)], value)
+        return texts
+
     def admin_screen(self):
         """
         Displays an admin screen, if password is correct, leads back to menu
@@ -122,6 +174,9 @@ class Gui(EventObject):
             show_menu (bool): specifies if the main menu should be displayed or not
         """
         Logger.info('GUI reset')
+        self.textures.log_statistics()
+        if self._gui_buffer is not None:
+            self._gui_buffer.log_statistics()
         self.ignore_all()
         self.remove_all_tasks()
         if self._current_window is not None and not self._current_window.is_empty():
@@ -141,17 +196,37 @@ class Gui(EventObject):
         Returns:
             a :obj:`str` with process text
         """
-        for value in re.findall(r'[{key}](\S*)[{key}]'.format(key=key), text):
-            try:
-                new_value = self._text_file.loc[value, self.engine.get_option('lang')]
-            except KeyError:
-                new_value = 'NaN'
-            if new_value == 'NaN':
-                # can be either missing key or language
-                Logger.error(f'missing text "{value}" for lang "{self.engine.get_option("lang")}"')
-                new_value = f'!{value}!'
-            text = text.replace('{key}{value}{key}'.format(key=key, value=value), new_value)
-        return text.replace('\\1', '\1').replace('\\2', '\2').replace('\\n', "\n").replace('\\t', '\t')
+        if key not in text and '\\' not in text:
+            # nothing to replace, e.g. dynamic texts like timers
+            return text
+
+        lang = self.engine.get_option('lang')
+        processed = self._processed_texts.get((text, lang, key), None)
+        if processed is not None:
+            self._processed_texts.move_to_end((text, lang, key))
+        else:
+            regex = self._text_regexes.get(key, None)
+            if regex is None:
+                # key words and escaped characters are replaced in a single pass
+                regex = re.compile(r'{key}(\S*){key}|\\([12nt])'.format(key=re.escape(key)))
+                self._text_regexes[key] = regex
+            texts = self._texts.get(lang, {})
+
+            def replace(match) -> str:
+                if match.group(2) is not None:
+                    return self._text_escapes[match.group(2)]
+                value = match.group(1)
+                if value not in texts:
+                    # can be either missing key or language
+                    Logger.error(f'missing text "{value}" for lang "{lang}"')
+                    return f'!{value}!'
+                return texts[value]
+
+            processed = regex.sub(replace, text)
+            self._processed_texts[(text, lang, key)] = processed
+            if len(self._processed_texts) > self._max_processed_texts:
+                self._processed_texts.popitem(last=False)
+        return processed
 
     def set_current_window(self, win=Window, **kwargs):
         """
@@ -163,7 +238,61 @@ class Gui(EventObject):
         """
         if self._current_window is not None and not self._current_window.is_empty():
             self._current_window.destroy()
-        self._current_window = win(self, **kwargs)
+        self.mark_dirty()
+
+        key = win.pool_key(**kwargs) if issubclass(win, Window) else None
+        pool = self._window_pool.get(key, None) if key is not None else None
+        if pool:
+            # reuse a released window with the same layout
+            self._current_window = pool.pop()
+            self._current_window.reconfigure(**kwargs)
+        else:
+            self._current_window = win(self, **kwargs)
+            if key is not None:
+                self._current_window.set_pool(self._window_pool.setdefault(key, []))
+
+    def mark_dirty(self):
+        """
+        Notify that the gui changed, so that it is redrawn if its refresh is limited
+        """
+        if self._gui_buffer is not None:
+            self._gui_buffer.mark_dirty()
+
+    def play_interval(self, interval, loop: bool = False):
+        """
+        Play an interval animating the gui, which is redrawn while it plays if its refresh is limited
+
+        Args:
+            interval: the interval
+            loop (bool): play the interval in loop
+
+        Returns:
+            the interval
+        """
+        if loop:
+            interval.loop()
+        else:
+            interval.start()
+        if self._gui_buffer is not None:
+            self._gui_buffer.track(interval)
+        return interval
+
+    def _is_animated(self):
+        """
+        Tell if the current window changes on every frame
+        """
+        return self._current_window is not None and not self._current_window.is_empty() \
+            and getattr(self._current_window, 'animated', False)
+
+    def clear_window_pool(self):
+        """
+        Destroy all released windows
+        """
+        for pool in self._window_pool.values():
+            for win in pool:
+                win.set_pool(None)
+                win.destroy()
+        self._window_pool.clear()
 
     def close_window_and_go(self, *args):
         """
@@ -180,12 +309,19 @@ class Gui(EventObject):
 
     def set_screen(self, cls=None):
         if self.screen is not None:
+            # windows are attached to the screen
+            if self._current_window is not None and not self._current_window.is_empty():
+                self._current_window.destroy()
+                self._current_window = None
+            self.clear_window_pool()
             self.screen.destroy()
         if cls is None:
             self.screen = MainScreen(self, show_version=True)
         else:
             self.screen = cls(self)
         self.screen.make()
+        self.screen.flatten_static()
+        self.mark_dirty()
 
     @event('set_screen')
     def on_set_screen(self, name=""):
@@ -464,3 +600,7 @@ class Gui(EventObject):
 
         props.set_undecorated(not self.engine.get_option('decorated_window'))
         self.engine.win.request_properties(props)
+
+        if self.engine.get_option('control_screen_limited_refresh') and self._gui_buffer is None:
+            # render the gui only when it changes
+            self._gui_buffer = GuiBuffer(self.engine, screen_number if with_3d_screens else 1, self._is_animated)
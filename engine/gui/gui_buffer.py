@@ -0,0 +1,113 @@
+from typing import Callable
+
+from panda3d.core import ButtonThrower, CardMaker, NodePath
+
+from engine.utils.logger import Logger
+
+
+class GuiBuffer:
+    """
+    Renders the control GUI (``render2d``) in an offscreen buffer, only on frames where it changed, and displays the
+    last rendering on the control screen as a single textured card.
+
+    The GUI is redrawn when it is marked dirty (see :meth:`mark_dirty`), when the mouse moves or a button is pressed,
+    while intervals of the GUI are playing (see :meth:`track`), and while ``is_live`` tells it is animated. The other
+    part of ``render2d``, over the 3D screens, is still rendered on every frame.
+    """
+    def __init__(self, engine, screen_number: int = 1, is_live: Callable[[], bool] = None):
+        """
+        Args:
+            engine: the main engine
+            screen_number (int): number of screens of the window, the control screen being the first one
+            is_live (:obj:`callable`, optional): function telling if the GUI should be redrawn on every frame
+        """
+        self._engine = engine
+        self._is_live = is_live if is_live is not None else lambda: False
+        self._dirty = True
+        self._last_mouse = None
+        self._intervals = []
+        self.redraws = 0
+        self.frames = 0
+
+        x, y = engine.get_option('screen_resolution')
+        self._buffer = engine.win.make_texture_buffer('control_gui', x, y)
+        self._buffer.set_sort(-100)
+        self._buffer.set_clear_color_active(True)
+        self._buffer.set_clear_color((0.0, 0.0, 0.0, 1.0))
+        # the control screen is the left part of render2d
+        width = 2.0 / screen_number
+        engine.makeCamera2d(self._buffer, coords=(-1.0, -1.0 + width, -1.0, 1.0), cameraName='control_gui_cam')
+
+        # the control screen part of render2d is not rendered on the window anymore, the card showing the buffer is
+        display_region = engine.cam2d.node().get_display_region(0)
+        if screen_number > 1:
+            # 2D nodes over the 3D screens (e.g. sun shader cards) are still rendered live
+            display_region.set_dimensions(1.0 / screen_number, 1.0, 0.0, 1.0)
+            lens = engine.cam2d.node().get_lens()
+            lens.set_film_size(2.0 - width, 2.0)
+            lens.set_film_offset(0.5 * width, 0.0)
+        else:
+            display_region.set_active(False)
+        self._root = NodePath('control_gui_composite')
+        self._root.set_depth_test(False)
+        self._root.set_depth_write(False)
+        cm = CardMaker('control_gui_card')
+        cm.set_frame(-1.0, 1.0, -1.0, 1.0)
+        card = self._root.attach_new_node(cm.generate())
+        card.set_texture(self._buffer.get_texture())
+        camera = engine.makeCamera2d(engine.win, displayRegion=(0.0, 1.0 / screen_number, 0.0, 1.0),
+                                     cameraName='control_gui_composite_cam')
+        camera.reparent_to(self._root)
+
+        # any button press may change the GUI (typing, selection), caught by a thrower of our own which only sends
+        # this event, so that the events of the default thrower are left untouched
+        thrower = ButtonThrower('control_gui_buttons')
+        thrower.set_throw_buttons_active(True)
+        thrower.set_button_down_event('control_gui_button')
+        engine.mouseWatcher.attach_new_node(thrower)
+        engine.accept('control_gui_button', lambda *args: self.mark_dirty())
+        engine.task_mgr.add(self._update, 'control_gui_refresh', sort=49)
+
+    def mark_dirty(self) -> None:
+        """
+        Redraw the GUI on the next frame
+        """
+        self._dirty = True
+
+    def track(self, interval) -> None:
+        """
+        Redraw the GUI while an interval is playing
+
+        Args:
+            interval: an interval animating the GUI
+        """
+        self._intervals.append(interval)
+
+    def log_statistics(self) -> None:
+        """
+        Log the number of frames the GUI was redrawn on
+        """
+        if self.frames > 0:
+            Logger.info(f'control gui redrawn on {self.redraws} frames out of {self.frames} '
+                        f'({100.0 * self.redraws / self.frames:.1f}%)')
+        self.redraws = 0
+        self.frames = 0
+
+    def _update(self, task):
+        if self._engine.mouseWatcherNode.has_mouse():
+            mouse = tuple(self._engine.mouseWatcherNode.get_mouse())
+            if mouse != self._last_mouse:
+                # hovered widgets are highlighted
+                self._last_mouse = mouse
+                self._dirty = True
+
+        if len(self._intervals) > 0:
+            self._intervals = [interval for interval in self._intervals if interval.isPlaying()]
+
+        active = self._dirty or len(self._intervals) > 0 or self._is_live()
+        self._buffer.set_active(active)
+        self._dirty = False
+        self.frames += 1
+        if active:
+            self.redraws += 1
+        return task.cont
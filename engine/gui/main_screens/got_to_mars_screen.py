@@ -87,15 +87,16 @@ class GoToMarsScreen(MainScreen):
                    icon_size=self._icon_size,
                    icon=None,
                    pos=(-1.2, -0.1))
+        self._static_window(w, static_text=True)
 
         for i, e in enumerate(self._left_panel):
             # text, should not move
-            OnscreenText(text=self._format(e),
-                         align=TextNode.ALeft,
-                         pos=(-0.5 * size_x + self._large_pad,
-                              - 0.5 * size_y + self._large_pad + i * (self._text_scale + self._small_pad)),
-                         scale=self._text_scale,
-                         parent=w.get_node())
+            self._static_text(text=self._format(e),
+                              align=TextNode.ALeft,
+                              pos=(-0.5 * size_x + self._large_pad,
+                                   - 0.5 * size_y + self._large_pad + i * (self._text_scale + self._small_pad)),
+                              scale=self._text_scale,
+                              parent=w.get_node())
             # values
             self._texts[e] = OnscreenText(text=self._format(e, True),
                                           align=TextNode.ARight,
@@ -115,6 +116,7 @@ class GoToMarsScreen(MainScreen):
                      icon_size=self._icon_size,
                      icon=None,
                      pos=(pos_x, 0.65))
+        self._static_window(com, static_text=True)
         self._texts['freq_comm'] = OnscreenText(
             text=f'\1title\1{self._format("freq_comm", True)}\2  \1light\1[MHZ]\2',
             align=TextNode.ACenter,
@@ -131,14 +133,15 @@ class GoToMarsScreen(MainScreen):
                         icon_size=self._icon_size,
                         icon=None,
                         pos=(pos_x, 0.05))
+        self._static_window(engine)
         for i, e in enumerate(self._engine_panel):
             # text, should not move
-            OnscreenText(text=self._format(e),
-                         align=TextNode.ALeft,
-                         pos=(-0.5 * size_x + self._large_pad,
-                              - 0.5 * size_y + self._large_pad + i * (self._text_scale + self._small_pad)),
-                         scale=self._text_scale,
-                         parent=engine.get_node())
+            self._static_text(text=self._format(e),
+                              align=TextNode.ALeft,
+                              pos=(-0.5 * size_x + self._large_pad,
+                                   - 0.5 * size_y + self._large_pad + i * (self._text_scale + self._small_pad)),
+                              scale=self._text_scale,
+                              parent=engine.get_node())
             # values
             self._texts[e] = OnscreenText(text=self._format(e, True),
                                           align=TextNode.ARight,
@@ -157,14 +160,15 @@ class GoToMarsScreen(MainScreen):
                        icon_size=self._icon_size,
                        icon=None,
                        pos=(pos_x, -0.54))
+        self._static_window(solar)
         for i, e in enumerate(self._solar_panel):
             # text, should not move
-            OnscreenText(text=self._format(e),
-                         align=TextNode.ALeft,
-                         pos=(-0.5 * size_x + self._large_pad,
-                              - 0.5 * size_y + self._large_pad + i * (self._text_scale + self._small_pad)),
-                         scale=self._text_scale,
-                         parent=solar.get_node())
+            self._static_text(text=self._format(e),
+                              align=TextNode.ALeft,
+                              pos=(-0.5 * size_x + self._large_pad,
+                                   - 0.5 * size_y + self._large_pad + i * (self._text_scale + self._small_pad)),
+                              scale=self._text_scale,
+                              parent=solar.get_node())
             # values
             self._texts[e] = OnscreenText(text=self._format(e, True),
                                           align=TextNode.ARight,
@@ -187,6 +191,7 @@ class GoToMarsScreen(MainScreen):
                                              title=self._format(value),
                                              )
             self._texts[value].set_pos(0.6 + i * size_x * 0.9, 0.0, 0.3)
+            self._static_window(self._texts[value])
 
     def _build_chrono(self, size_x=1.25, size_y=0.5):
         self._chrono = ChronoWindow(self.gui,
@@ -197,3 +202,4 @@ class GoToMarsScreen(MainScreen):
                                     icon_size=self._icon_size,
                                     pos=(1., -0.65)
                                     )
+        self._static_window(self._chrono)
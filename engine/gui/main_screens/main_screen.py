@@ -1,8 +1,11 @@
 from direct.gui.DirectFrame import DirectFrame
 from direct.gui.OnscreenText import OnscreenText
+from panda3d.core import TransparencyAttrib, NodePath, PGFrameStyle
 
 from engine import __version__ as version
 from engine.utils.event_handler import EventObject
+from engine.utils.latency import latency_tracker
+from engine.utils.logger import Logger
 
 
 class MainScreen(EventObject):
@@ -39,6 +42,11 @@ class MainScreen(EventObject):
                              pos=(-0.8 * ar, -0.9), scale=0.07, fg=(0.8, 0.7, 0.6, 0.8))
             t.setBin('gui-popup', 1)
 
+        # static nodes (labels, titles, frames, shadows) are flattened once the screen is built,
+        # frames and shadows under all windows
+        self._static_back = self._background.attach_new_node('static_back')
+        self._static_nodes = []
+
     def destroy(self):
         self._background.remove_node()
 
@@ -65,12 +73,14 @@ class MainScreen(EventObject):
             key (str): the name of the state to update
         """
         if key in self._texts:
+            self.gui.mark_dirty()
             if isinstance(self._texts[key], OnscreenText):
                 # update the text
                 self._texts[key].setText(text=self._format(key, True))
             else:
                 # it is a gauge, set the value between 0 and 1
                 self._texts[key].set_value(self._get_value(key) / 100)
+            latency_tracker.mark_current('gui')
 
     def _format(self, name, value=False):
         """
@@ -104,3 +114,56 @@ class MainScreen(EventObject):
         Build the screen
         """
         pass
+
+    def _static_text(self, **kwargs) -> OnscreenText:
+        """
+        Create a text that never changes, flattened with other static nodes in :meth:`flatten_static`
+        """
+        # the text is generated as plain geometry, a TextNode cannot be flattened
+        text = OnscreenText(mayChange=False, **kwargs)
+        self._static_nodes.append((text, True))
+        return text
+
+    def _static_window(self, window, static_text: bool = False) -> None:
+        """
+        Flatten the shadow, frame and title of a window with other static nodes in :meth:`flatten_static`, and its
+        text if ``static_text`` is set
+        """
+        back, texts = window.get_static_nodes(static_text)
+        self._static_nodes.extend((node, False) for node in back)
+        self._static_nodes.extend((node, True) for node in texts)
+
+    def _count_draw_calls(self) -> int:
+        """
+        Estimate the number of draw calls of the screen, counting the geometry of texts and frames of GUI items
+        """
+        count = 0
+        for node in self._background.find_all_matches('**/+GeomNode'):
+            count += node.node().get_num_geoms()
+        for node in self._background.find_all_matches('**/+TextNode'):
+            count += sum(n.node().get_num_geoms() for n in
+                         NodePath(node.node().generate()).find_all_matches('**/+GeomNode'))
+        for node in self._background.find_all_matches('**/+PGItem'):
+            item = node.node()
+            if item.get_frame_style(item.get_state()).get_type() != PGFrameStyle.T_none:
+                count += 1
+        return count
+
+    def flatten_static(self) -> None:
+        """
+        Gather static nodes in a few batched nodes. Called once the screen is built
+        """
+        if len(self._static_nodes) == 0:
+            return
+        before = self._count_draw_calls()
+        # static texts are drawn over all windows
+        static_front = self._background.attach_new_node('static_front')
+        for node, front in self._static_nodes:
+            node.wrt_reparent_to(static_front if front else self._static_back)
+        self._static_nodes.clear()
+
+        for node in [self._static_back, static_front]:
+            node.setTransparency(TransparencyAttrib.MAlpha)
+            node.flatten_strong()
+        Logger.info(f'{type(self).__name__}: {before} draw calls before flattening static nodes, '
+                    f'{self._count_draw_calls()} after')
@@ -0,0 +1,146 @@
+import glob
+import json
+import os
+import re
+from typing import Dict, Iterable, Set, Tuple
+
+from panda3d.core import TextureStage
+
+from engine.utils.logger import Logger
+
+
+class TextureCache:
+    """
+    Textures of the GUI, loaded once and shared by path. Icons can also be taken from a packed atlas, described by a
+    json file with the atlas image and the region of each icon:
+
+    .. code-block:: json
+
+        {"image": "data/gui/icons/atlas.png", "icons": {"chat": [0.0, 0.5, 0.25, 0.75]}}
+
+    where a region is given as ``[u_min, v_min, u_max, v_max]``.
+    """
+    # icons used by the code, not only by scenarios
+    default_icons = ('chat', 'caution', 'load_spinner', 'logo_sb', 'checkbox_on', 'checkbox_off')
+    _icon_regex = re.compile(r'icon="([^"]+)"')
+
+    def __init__(self, engine):
+        """
+        Args:
+            engine: the main engine
+        """
+        self._engine = engine
+        self._textures = dict()
+        self._atlas = None
+        self._atlas_regions: Dict[str, Tuple[float, float, float, float]] = dict()
+        self.hits = 0
+        self.misses = 0
+
+        if engine.get_option('icon_atlas') is not None:
+            self.load_atlas(engine.get_option('icon_atlas'))
+
+    def get(self, path: str):
+        """
+        Get a texture, loaded on first use
+
+        Args:
+            path (str): the image file
+
+        Returns:
+            the texture
+        """
+        texture = self._textures.get(path, None)
+        if texture is None:
+            self.misses += 1
+            texture = self._engine.loader.load_texture(path)
+            self._textures[path] = texture
+        else:
+            self.hits += 1
+        return texture
+
+    def icon_path(self, name: str) -> str:
+        """
+        Get the image file of an icon
+        """
+        return os.path.join(self._engine.get_option('icon_path'), name.replace('.png', '') + '.png')
+
+    def get_icon(self, name: str):
+        """
+        Get the texture of an icon, from its own image file
+        """
+        return self.get(self.icon_path(name))
+
+    def icon_texture(self, name: str):
+        """
+        Get the texture an icon is displayed from: the atlas if it contains the icon, its own image file otherwise.
+        The region of the atlas is then set by :meth:`set_icon_region`
+        """
+        if name in self._atlas_regions:
+            self.hits += 1
+            return self._atlas
+        return self.get_icon(name)
+
+    def set_icon(self, image, name: str) -> None:
+        """
+        Display an icon on an image, taken from the atlas if it contains it
+
+        Args:
+            image (OnscreenImage): the image, or any widget with a ``setImage`` method
+            name (str): the icon name
+        """
+        image.setImage(self.icon_texture(name))
+        self.set_icon_region(image, name)
+
+    def set_icon_region(self, image, name: str) -> None:
+        """
+        Show only the region of an icon on an image displaying the texture given by :meth:`icon_texture`
+
+        Args:
+            image (NodePath): the image
+            name (str): the icon name
+        """
+        region = self._atlas_regions.get(name, None)
+        if region is None:
+            # the image may have shown an icon of the atlas before
+            image.clear_tex_transform(TextureStage.get_default())
+        else:
+            u_min, v_min, u_max, v_max = region
+            image.set_tex_offset(TextureStage.get_default(), u_min, v_min)
+            image.set_tex_scale(TextureStage.get_default(), u_max - u_min, v_max - v_min)
+
+    def load_atlas(self, file_name: str) -> None:
+        """
+        Load a packed icon atlas
+
+        Args:
+            file_name (str): the json file describing the atlas
+        """
+        with open(file_name, 'r') as file:
+            description = json.load(file)
+        self._atlas = self.get(description['image'])
+        self._atlas_regions = {name: tuple(region) for name, region in description['icons'].items()}
+        Logger.info(f'icon atlas "{file_name}" loaded with {len(self._atlas_regions)} icons')
+
+    def scenario_icons(self) -> Set[str]:
+        """
+        Find the icons used by scenarios
+        """
+        icons = set()
+        for file_name in glob.glob(os.path.join(self._engine.get_option('scenario_path'), '*.xml')):
+            with open(file_name, 'r', encoding='utf-8') as file:
+                icons.update(self._icon_regex.findall(file.read()))
+        return icons
+
+    def preload_icons(self, names: Iterable[str]) -> None:
+        """
+        Load the textures of icons that are not in the atlas
+        """
+        for name in names:
+            if name not in self._atlas_regions and os.path.exists(self.icon_path(name)):
+                self.get_icon(name)
+
+    def log_statistics(self) -> None:
+        """
+        Log the number of textures and the cache hits and misses
+        """
+        Logger.info(f'gui textures: {len(self._textures)} loaded, {self.hits} hits, {self.misses} misses')
@@ -1,4 +1,3 @@
-import os
 from panda3d.core import TextPropertiesManager, TextProperties
 
 
@@ -17,12 +16,13 @@ def hex_to_rgb(str_hex, alpha=1.0):
     return to_list[0] / 255, to_list[1] / 255, to_list[2] / 255, alpha
 
 
-def build_text_properties(engine):
+def build_text_properties(engine, fonts):
     """
     Build the common text properties (font, color etc)
 
     Args:
         engine: the main engine
+        fonts (FontManager): the font manager
     """
     from engine.gui.gui import Gui
 
@@ -30,11 +30,8 @@ def build_text_properties(engine):
     props = TextPropertiesManager.getGlobalPtr()
 
     # fonts
-    default_font = engine.loader.load_font(os.path.join(engine.get_option("font_path"), engine.get_option('font')))
-    default_font.setPixelsPerUnit(engine.get_option('font_pixels_per_unit'))
-
-    font_bold = engine.loader.load_font(os.path.join(engine.get_option("font_path"), engine.get_option('font_bold')))
-    font_bold.setPixelsPerUnit(engine.get_option('font_pixels_per_unit'))
+    default_font = fonts.get(engine.get_option('font'), engine.get_option('font_pixels_per_unit'))
+    font_bold = fonts.get(engine.get_option('font_bold'), engine.get_option('font_pixels_per_unit'))
 
     tp = TextProperties()
     tp.setSlant(.2)
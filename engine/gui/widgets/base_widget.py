@@ -1,7 +1,7 @@
 import os
 
-from direct.gui.OnscreenImage import OnscreenImage
-from panda3d.core import TransparencyAttrib, NodePath
+from panda3d.core import (TransparencyAttrib, GeomNode, Geom, GeomVertexData, GeomVertexFormat, GeomVertexWriter,
+                          GeomTriangles, PNMImage, Filename, Texture, SamplerState)
 
 from engine.utils.event_handler import EventObject
 
@@ -10,12 +10,21 @@ class BaseWidget(EventObject):
     shadows_path = 'data/gui/shadow'
     _selected_button = None
 
+    # shadow images in the shadow atlas, by position in the grid of tiles
+    _shadow_tiles = {'_dl': (0, 0), '_d': (1, 0), '_corner': (2, 0), '_r': (0, 1), '_ur': (1, 1)}
+    _shadow_atlas_shape = (4, 2)
+    _shadow_tile_size = 128
+    _shadow_texture = None
+    # shadow meshes, by widget bounds
+    _shadow_geoms = dict()
+
     def __init__(self,
                  gui_engine,
                  shadow_scale=0.05):
         super().__init__()
         self._gui_engine = gui_engine
         self._widget = None
+        self._shadow = None
         self._shadow_scale = shadow_scale
 
     def play_sound(self, sound_name: str) -> None:
@@ -44,27 +53,85 @@ class BaseWidget(EventObject):
 
     def set_shadow(self, y_shift=1E-3):
         """
-        Add a smooth shadow under the widget
+        Add a smooth shadow under the widget. The shadow is a single nine-slice mesh textured by an atlas of the
+        shadow images, shared by all widgets of the same size
         """
         self.get_bounds()
         x1, x2, y1, y2 = self._widget.getBounds()
-        node = NodePath(self._widget.getName() + '_shadow')
-        node.reparent_to(self._widget)
-        scale = self._shadow_scale
-
-        def place_shadow_im(name, x, y, sx=scale, sy=scale):
-            loc_im = OnscreenImage(os.path.join(self.shadows_path, 'light{}.png'.format(name)),
-                                   parent=node,
-                                   scale=(sx, 1, sy))
-            loc_im.set_pos((x, 0, y))
-            loc_im.setTransparency(TransparencyAttrib.MAlpha)
-
-        place_shadow_im('_dl', x1 + scale, y1 - scale + y_shift)
-        place_shadow_im('_corner', x2 + scale, y1 - scale + y_shift)
-        place_shadow_im('_d', 0.5 * (x1 + x2) + scale, y1 - scale + y_shift, 0.5 * (x2 - x1) - scale)
-        place_shadow_im('_r', x2 + scale, 0.5 * (y1 + y2) - scale, scale, 0.5 * (y2 - y1) - scale)
-        place_shadow_im('_ur', x2 + scale, y2 - scale)
-        node.flatten_strong()
+        key = tuple(round(v, 5) for v in (x1, x2, y1, y2, self._shadow_scale, y_shift))
+        if key not in BaseWidget._shadow_geoms:
+            BaseWidget._shadow_geoms[key] = self._make_shadow_geom(x1, x2, y1, y2, self._shadow_scale, y_shift)
+
+        geom_node = GeomNode(self._widget.getName() + '_shadow')
+        geom_node.add_geom(BaseWidget._shadow_geoms[key])
+        node = self._widget.attach_new_node(geom_node)
+        node.set_texture(self._shadow_atlas())
+        node.setTransparency(TransparencyAttrib.MAlpha)
+        self._shadow = node
+
+    @classmethod
+    def _shadow_atlas(cls):
+        """
+        Get the texture gathering all shadow images, built on first use
+        """
+        if cls._shadow_texture is None:
+            size = cls._shadow_tile_size
+            atlas = PNMImage(size * cls._shadow_atlas_shape[0], size * cls._shadow_atlas_shape[1], 4)
+            for name, (i, j) in cls._shadow_tiles.items():
+                image = PNMImage(Filename(os.path.join(cls.shadows_path, 'light{}.png'.format(name))))
+                if image.get_x_size() != size or image.get_y_size() != size:
+                    image_resized = PNMImage(size, size, 4)
+                    image_resized.quick_filter_from(image)
+                    image = image_resized
+                if not image.has_alpha():
+                    image.add_alpha()
+                atlas.copy_sub_image(image, i * size, j * size)
+            cls._shadow_texture = Texture('shadow_atlas')
+            cls._shadow_texture.load(atlas)
+            cls._shadow_texture.set_wrap_u(SamplerState.WM_clamp)
+            cls._shadow_texture.set_wrap_v(SamplerState.WM_clamp)
+        return cls._shadow_texture
+
+    @classmethod
+    def _make_shadow_geom(cls, x1, x2, y1, y2, scale, y_shift):
+        """
+        Build the shadow mesh of a widget, made of five pieces of the shadow atlas: bottom left, bottom, bottom
+        right corner, right and upper right
+
+        Returns:
+            a :obj:`Geom`
+        """
+        d = 2.0 * scale
+        quads = [('_dl', x1, x1 + d, y1 - d + y_shift, y1 + y_shift),
+                 ('_d', x1 + d, x2, y1 - d + y_shift, y1 + y_shift),
+                 ('_corner', x2, x2 + d, y1 - d + y_shift, y1 + y_shift),
+                 ('_r', x2, x2 + d, y1, y2 - d),
+                 ('_ur', x2, x2 + d, y2 - d, y2)]
+
+        vdata = GeomVertexData('shadow', GeomVertexFormat.get_v3t2(), Geom.UH_static)
+        vdata.set_num_rows(4 * len(quads))
+        vertex = GeomVertexWriter(vdata, 'vertex')
+        texcoord = GeomVertexWriter(vdata, 'texcoord')
+        triangles = GeomTriangles(Geom.UH_static)
+
+        n_x, n_y = cls._shadow_atlas_shape
+        # half a texel inside each tile, so that tiles do not bleed into each other
+        pad_u = 0.5 / (cls._shadow_tile_size * n_x)
+        pad_v = 0.5 / (cls._shadow_tile_size * n_y)
+        for k, (name, left, right, bottom, top) in enumerate(quads):
+            i, j = cls._shadow_tiles[name]
+            u0, u1 = i / n_x + pad_u, (i + 1) / n_x - pad_u
+            v0, v1 = 1.0 - (j + 1) / n_y + pad_v, 1.0 - j / n_y - pad_v
+            for x, z, u, v in [(left, bottom, u0, v0), (right, bottom, u1, v0), (right, top, u1, v1),
+                               (left, top, u0, v1)]:
+                vertex.add_data3(x, 0.0, z)
+                texcoord.add_data2(u, v)
+            triangles.add_vertices(4 * k, 4 * k + 1, 4 * k + 2)
+            triangles.add_vertices(4 * k, 4 * k + 2, 4 * k + 3)
+
+        geom = Geom(vdata)
+        geom.add_primitive(triangles)
+        return geom
 
     def destroy(self):
         super().destroy()
@@ -1,5 +1,3 @@
-import os
-
 from direct.gui.DirectButton import DirectButton
 from direct.gui.DirectGuiGlobals import FLAT, NORMAL, ENTER, EXIT
 from panda3d.core import TransparencyAttrib, LVector3f, TextNode, LVector2f
@@ -16,10 +14,8 @@ class CheckBox(BaseWidget):
         super(CheckBox, self).__init__(gui_engine, shadow_scale=0.0)
         self._is_selected = False
         self._value = value
-        self._im_on = os.path.join(self._gui_engine.engine.get_option('icon_path'), 'checkbox_on.png')
-        self._im_off = os.path.join(self._gui_engine.engine.get_option('icon_path'), 'checkbox_off.png')
 
-        self._widget = DirectButton(image=self._im_on if value else self._im_off,
+        self._widget = DirectButton(image=self._gui_engine.textures.icon_texture(self._icon_name(value)),
                                     image_scale=scale,
                                     # color=(0, 0, 0, 1),
                                     frameColor=(0, 0, 0, 0),
@@ -32,14 +28,16 @@ class CheckBox(BaseWidget):
         self._widget.bind(EXIT, self.un_select)
 
         self._widget.setTransparency(TransparencyAttrib.MAlpha)
+        self._gui_engine.textures.set_icon_region(self._widget, self._icon_name(value))
         # self.set_size(size_x, size_y)
 
+    @staticmethod
+    def _icon_name(value):
+        return 'checkbox_on' if value else 'checkbox_off'
+
     def set_value(self, value=None):
         self._value = not self._value if value is None else value
-        if self._value:
-            self._widget.setImage(self._im_on)
-        else:
-            self._widget.setImage(self._im_off)
+        self._gui_engine.textures.set_icon(self._widget, self._icon_name(self._value))
 
     def get(self, _=None):
         return self._value
@@ -38,6 +38,7 @@ class ChronoWindow(Window):
         self._update()
 
     def _update(self, task=None):
+        self._gui_engine.mark_dirty()
         if self._time is None:
             self._chrono.setText('\1{color}\1{time}\2'.format(color='chrono', time='.. : ..'))
         else:
@@ -60,6 +61,7 @@ class ChronoWindow(Window):
             time (float): the time in seconds
         """
         self._time = time
+        self._gui_engine.mark_dirty()
         self._chrono.setText('\1{color}\1{time}\2'.
                              format(color='chrono' if self._time >= self._alert else 'chrono-alert',
                                     time=re.search(r'\d*:(\d*:\d*)',
@@ -36,11 +36,12 @@ class EndWindow(Window):
             .replace('POSITION', str(player_position))\
             .replace('TOTAL', str(total_players))
 
-        OnscreenImage(image=self._gui_engine.engine.get_option('icon_path') + 'logo_sb.png',
-                      pos=(1.25, 0, 0.75),
-                      scale=(0.5, 1.0, 0.2),
-                      color=self.color('golden'),
-                      parent=self._widget)
+        logo = OnscreenImage(image=self._gui_engine.textures.icon_texture('logo_sb'),
+                             pos=(1.25, 0, 0.75),
+                             scale=(0.5, 1.0, 0.2),
+                             color=self.color('golden'),
+                             parent=self._widget)
+        self._gui_engine.textures.set_icon_region(logo, 'logo_sb')
 
         def appear(node, time):
             return LerpColorScaleInterval(node, time, colorScale=(1, 1, 1, 1), startColorScale=(1, 1, 1, 0))
@@ -83,10 +84,11 @@ class EndWindow(Window):
 
         # fade-in time
         self._widget.set_color_scale((1, 1, 1, 0))
-        appear(self._background, 5.0).start()
-        self._gui_engine.do_method_later(5.0, lambda task: appear(self._widget, 5.0).start(), 'show_screen')
+        self._gui_engine.play_interval(appear(self._background, 5.0))
+        self._gui_engine.do_method_later(5.0, lambda task: self._gui_engine.play_interval(appear(self._widget, 5.0)),
+                                         'show_screen')
         self._gui_engine.do_method_later(10.0, self._scroll, 'end_screen_scrolling')
 
     def _scroll(self, _=None):
         bl, tr = self._text.get_tight_bounds()
-        self._text.posInterval(35.0, LVector3f(0, 0, 1.0 + 1.2 * abs(tr.z - bl.z))).start()
+        self._gui_engine.play_interval(self._text.posInterval(35.0, LVector3f(0, 0, 1.0 + 1.2 * abs(tr.z - bl.z))))
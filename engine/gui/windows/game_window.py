@@ -56,6 +56,8 @@ class GameWindow(Window):
     """
     Emulating a simple2d game
     """
+    animated = True
+
     def __init__(self,
                  gui_engine,
                  goal,
@@ -154,7 +156,7 @@ class GameWindow(Window):
                 Func(text.remove_node),
                 Func(start),
             )
-            self._interval.start()
+            self._gui_engine.play_interval(self._interval)
 
         elif self._status == 1:
             # win
@@ -177,7 +179,7 @@ class GameWindow(Window):
                 Func(text.remove_node),
                 Func(done)
             )
-            self._interval.start()
+            self._gui_engine.play_interval(self._interval)
         else:
             pass
 
@@ -267,7 +269,8 @@ class GameWindow(Window):
 
     def _get_sprite(self, name, **kwargs):
         sprite = OnscreenImage(
-            image=os.path.join(self._gui_engine.engine.get_option('image_path'), name.replace('.png', '') + '.png'),
+            image=self._gui_engine.textures.get(os.path.join(self._gui_engine.engine.get_option('image_path'),
+                                                             name.replace('.png', '') + '.png')),
             **kwargs
         )
         sprite.setTransparency(TransparencyAttrib.MAlpha)
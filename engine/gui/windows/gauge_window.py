@@ -1,12 +1,18 @@
-from panda3d.core import CardMaker, LVector4f
+from array import array
+
+from panda3d.core import (Geom, GeomNode, GeomTriangles, GeomVertexArrayFormat, GeomVertexData, GeomVertexFormat,
+                          GeomVertexWriter, TransparencyAttrib)
 
 from engine.gui.windows.window import Window
 
 
 class GaugeWindow(Window):
     """
-    A custom widget representing a gauge
+    A custom widget representing a gauge. All bars are drawn as a single Geom with a color per vertex, and the colors
+    of each possible number of lit bars are precomputed, so that changing the value rewrites the color column at once
     """
+    _vertex_format = None
+
     def __init__(self,
                  gui_engine,
                  size_x=1.0,
@@ -28,22 +34,42 @@ class GaugeWindow(Window):
         self._evolution_per_seconds = evolution_per_seconds
         self._build_gauge()
 
-    def _color(self, i):
-        cols = {'r': self.color('red'),
-                'g': self.color('green'),
-                'b': self.color('blue')}
-        x = (i + 1) / self._bars
-        if len(self._gauge_color) == 2:
-            res = LVector4f(cols[self._gauge_color[0]]) * (1 - x) + LVector4f(cols[self._gauge_color[1]]) * x
-        else:
-            res = LVector4f(cols[self._gauge_color[0]]) * (1 - x) ** 2 \
-                  + LVector4f(cols[self._gauge_color[1]]) * 2 * x * (1 - x) \
-                  + LVector4f(cols[self._gauge_color[2]]) * x ** 2.0
-        if i > self._gauge_value * self._bars:
-            res.w = 0.2
-        else:
-            res.w = 1.0
-        return res
+    @classmethod
+    def _gauge_format(cls):
+        """
+        Get the vertex format of gauges, with positions and colors in separate arrays
+        """
+        if cls._vertex_format is None:
+            vertex_array = GeomVertexArrayFormat()
+            vertex_array.add_column('vertex', 3, Geom.NT_float32, Geom.C_point)
+            color_array = GeomVertexArrayFormat()
+            color_array.add_column('color', 4, Geom.NT_float32, Geom.C_color)
+            vertex_format = GeomVertexFormat()
+            vertex_format.add_array(vertex_array)
+            vertex_format.add_array(color_array)
+            cls._vertex_format = GeomVertexFormat.register_format(vertex_format)
+        return cls._vertex_format
+
+    def _palette(self):
+        """
+        Compute the color of each bar
+        """
+        cols = [self.color({'r': 'red', 'g': 'green', 'b': 'blue'}[c]) for c in self._gauge_color]
+        palette = []
+        for i in range(self._bars):
+            x = (i + 1) / self._bars
+            if len(cols) == 2:
+                weights = [1 - x, x]
+            else:
+                weights = [(1 - x) ** 2, 2 * x * (1 - x), x ** 2]
+            palette.append([sum(w * c[k] for w, c in zip(weights, cols)) for k in range(3)])
+        return palette
+
+    def _lit_bars(self, value):
+        """
+        Number of bars lit for a value
+        """
+        return min(self._bars, int(value * self._bars) + 1)
 
     def _build_gauge(self):
         widget_pad = 0.05
@@ -54,12 +80,35 @@ class GaugeWindow(Window):
         h = total_h / (self._bars * (alpha + 1) - alpha)
         bar_pad = alpha * h
         # h = (total_h - (self._gauge_range - 1) * bar_pad) / self._gauge_range
+
+        self._vdata = GeomVertexData('gauge', self._gauge_format(), Geom.UH_dynamic)
+        self._vdata.set_num_rows(4 * self._bars)
+        vertex = GeomVertexWriter(self._vdata, 'vertex')
+        triangles = GeomTriangles(Geom.UH_static)
         for i in range(self._bars):
-            cm = CardMaker('gauge_{}'.format(i))
-            cm.set_frame(-0.5 * total_w, 0.5 * total_w,
-                         - 0.5 * self._size[1] + 2.0 * widget_pad + i * h,
-                         - 0.5 * self._size[1] + 2.0 * widget_pad + i * h + h - bar_pad)
-            self._gauge.attachNewNode(cm.generate())
+            bottom = - 0.5 * self._size[1] + 2.0 * widget_pad + i * h
+            top = bottom + h - bar_pad
+            for x, z in [(-0.5 * total_w, bottom), (0.5 * total_w, bottom), (0.5 * total_w, top),
+                         (-0.5 * total_w, top)]:
+                vertex.add_data3(x, 0.0, z)
+            triangles.add_vertices(4 * i, 4 * i + 1, 4 * i + 2)
+            triangles.add_vertices(4 * i, 4 * i + 2, 4 * i + 3)
+        geom = Geom(self._vdata)
+        geom.add_primitive(triangles)
+        geom_node = GeomNode('gauge')
+        geom_node.add_geom(geom)
+        self._gauge.attach_new_node(geom_node)
+        self._gauge.setTransparency(TransparencyAttrib.MAlpha)
+
+        # color column for each number of lit bars, dimmed bars being transparent
+        palette = self._palette()
+        self._colors = []
+        for n in range(self._bars + 1):
+            column = array('f')
+            for i, color in enumerate(palette):
+                column.extend((color + [1.0 if i < n else 0.2]) * 4)
+            self._colors.append(column.tobytes())
+        self._lit = None
         self.set_value(self._gauge_value)
 
     def set_value(self, value, dynamic=True):
@@ -79,8 +128,11 @@ class GaugeWindow(Window):
         self._update()
 
     def _update(self):
-        for i in range(self._bars):
-            self._gauge.get_child(i).set_color(self._color(i))
+        lit = self._lit_bars(self._gauge_value)
+        if lit != self._lit:
+            self._lit = lit
+            self._gui_engine.mark_dirty()
+            self._vdata.modify_array_handle(1).copy_data_from(self._colors[lit])
 
     def _evolution(self, task):
         if self._gauge_value == self._target_value:
@@ -1,5 +1,3 @@
-import os
-
 from direct.gui.DirectCheckButton import DirectCheckButton
 from direct.gui.DirectEntry import DirectEntry
 from direct.gui.DirectFrame import DirectFrame
@@ -67,11 +65,12 @@ class OptionWindow(BaseWidget):
                          parent=self._widget)
 
         if icon is not None:
-            OnscreenImage(image=os.path.join(self._gui_engine.engine.get_option('icon_path'), '{}.png'.format(icon)),
-                          scale=icon_size,
-                          pos=(0.5 * self._size[0] - icon_size - self._widget_pad, 0.0,
-                               0.5 * self._size[1] - icon_size - self._widget_pad),
-                          parent=self._widget)
+            im = OnscreenImage(image=self._gui_engine.textures.icon_texture(icon),
+                               scale=icon_size,
+                               pos=(0.5 * self._size[0] - icon_size - self._widget_pad, 0.0,
+                                    0.5 * self._size[1] - icon_size - self._widget_pad),
+                               parent=self._widget)
+            self._gui_engine.textures.set_icon_region(im, icon)
 
         if life_time > 0.0:
             self._gui_engine.doMethodLater(life_time,
@@ -87,6 +86,7 @@ class OptionWindow(BaseWidget):
     def destroy(self):
         self._widget.ignore_all()
         self._widget.destroy()
+        self._gui_engine.mark_dirty()
 
     def add_option(self, name, value):
         self._text_scale = 0.04
@@ -1,4 +1,3 @@
-import os
 import re
 
 from direct.gui.DirectEntry import DirectEntry
@@ -10,6 +9,8 @@ class TerminalWindow(Window):
     """
     A custom widget representing a gauge
     """
+    animated = True
+
     def __init__(self,
                  gui_engine,
                  size_x=1.0,
@@ -26,8 +27,7 @@ class TerminalWindow(Window):
             numLines=self.num_lines,
             text_fg=self.color('light'),
             overflow=True,
-            text_font=self._gui_engine.engine.loader.load_font(os.path.join(self._gui_engine.engine.get_option("font_path"),
-                                                                            'UbuntuMono-B.ttf')),
+            text_font=self._gui_engine.fonts.get(self._gui_engine.engine.get_option('terminal_font')),
             command=self.process,
             frameColor=self.color('terminal_bg'),
             pos=(- 0.5 * size_x + self._widget_pad, 0, 0.5 * size_y - 4 * self._widget_pad - self._text_scale),
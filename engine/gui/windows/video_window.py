@@ -7,6 +7,8 @@ class VideoWindow(Window):
     """
     A custom widget playing a video
     """
+    animated = True
+
     def __init__(self,
                  gui_engine,
                  video_path,
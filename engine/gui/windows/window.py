@@ -1,10 +1,8 @@
-import os
-
 from direct.gui.DirectEntry import DirectEntry
 from direct.gui.DirectFrame import DirectFrame
 from direct.gui.OnscreenImage import OnscreenImage
 from direct.gui.OnscreenText import OnscreenText
-from panda3d.core import TransparencyAttrib, TextNode, CardMaker, Vec3
+from panda3d.core import TransparencyAttrib, TextNode, CardMaker, Vec3, NodePath, PGFrameStyle
 
 from engine.gui.widgets.base_widget import BaseWidget
 
@@ -13,7 +11,14 @@ class Window(BaseWidget):
     """
     A custom widget representing a 2D window on the screen with an optional title and custom buttons. This window
     can be moved.
+
+    Windows created by :meth:`Gui.set_current_window` can be pooled: instead of being destroyed, a pooled window is
+    hidden and later reconfigured in place (text, title, icon, password, callbacks, life time) with
+    :meth:`reconfigure`, for a window with the same layout.
     """
+    # if the window changes on every frame, e.g. a video
+    animated = False
+
     def __init__(self,
                  gui_engine,
                  color='dark-window',
@@ -43,6 +48,9 @@ class Window(BaseWidget):
                  **kwargs):
         super(Window, self).__init__(gui_engine)
 
+        self._pool = None
+        self._released = False
+
         self._background = None
         if background_color is not None:
             ar = self._gui_engine.engine.get_option('screen_resolution')[0] / self._gui_engine.engine.get_option('screen_resolution')[1]
@@ -59,9 +67,6 @@ class Window(BaseWidget):
             parent=gui_engine.screen
         )
 
-        if pos is not None:
-            self.set_pos(pos[0], 0.0, pos[-1])
-
         self._size = (size_x, size_y)
 
         self.setTransparency(TransparencyAttrib.MAlpha)
@@ -70,17 +75,17 @@ class Window(BaseWidget):
         self._widget_pad = 0.03
         self._text_scale = text_size
 
+        self._title = None
         if title is not None:
-            OnscreenText(text='\1title\1{}\2'.format(title.upper()),
-                         align=TextNode.ALeft,
-                         pos=(-0.5 * size_x + self._widget_pad, 0.5 * size_y - self._widget_pad - self._text_scale),
-                         scale=self._text_scale,
-                         parent=self._widget)
+            self._title = OnscreenText(align=TextNode.ALeft,
+                                       pos=(-0.5 * size_x + self._widget_pad,
+                                            0.5 * size_y - self._widget_pad - self._text_scale),
+                                       scale=self._text_scale,
+                                       parent=self._widget)
 
         self._text = None
         if text is not None:
-            self._text = OnscreenText(text=text,
-                                      fg=self.color(text_color),
+            self._text = OnscreenText(fg=self.color(text_color),
                                       wordwrap=size_x / self._text_scale * 0.9,
                                       align=text_align,
                                       pos=(-0.5 * size_x + self._widget_pad if text_align == TextNode.ALeft else
@@ -91,13 +96,12 @@ class Window(BaseWidget):
 
         self._text_tooltip = None
         self._entry = None
-        self._on_password_find = on_password_find
-        self._on_password_fail = on_password_fail
-        self._password = password
+        self._on_password_find = None
+        self._on_password_fail = None
+        self._password = None
 
         if password is not None:
             text_width = 10
-            self._text_tooltip = entry_hint
             self._entry = DirectEntry(
                 obscured=hide_password,
                 command=self.check,
@@ -108,23 +112,118 @@ class Window(BaseWidget):
                 text_fg=self.color(text_color),
                 parent=self._widget,
                 scale=self._text_scale,
-                focus=focus,
+                focus=0,
                 pos=(-0.5 * size_x + 0.5 * (1 - entry_width) * size_x, -1.0, - 0.5 * size_y + 2.0 * self._widget_pad + self._text_scale),
             )
             # correct size
             self._entry['width'] = text_width * entry_width / (self._entry.getWidth() * self._entry.getScale().x)
             self._entry.updateWidth()
             self._entry.resetFrameSize()
+            self._entry.setTransparency(TransparencyAttrib.MAlpha)
+        elif callable(on_enter):
+            OnscreenText(scale=0.05, parent=self._widget,
+                         pos=(0, -0.5 * size_y - 2 * self._widget_pad),
+                         text=self._gui_engine.process_text('$window_enter_to_close$'),
+                         fg=(1.0, 0.8, 0.7, 0.6)
+                         )
+
+        self._icon = None
+        self._icon_name = None
+        self._icon_interval = None
+        if icon is not None:
+            self._icon = OnscreenImage(image=self._gui_engine.textures.icon_texture(icon),
+                                       scale=icon_size,
+                                       pos=(0.5 * self._size[0] - icon_size - self._widget_pad, 0.0,
+                                            0.5 * self._size[1] - icon_size - self._widget_pad),
+                                       parent=self._widget)
 
+        if shadow:
+            self.set_shadow()
+
+        self._configure(life_time=life_time, title=title, text=text, pos=pos, on_enter=on_enter, password=password,
+                        on_password_find=on_password_find, on_password_fail=on_password_fail,
+                        on_entry_add=on_entry_add, on_entry_delete=on_entry_delete, entry_hint=entry_hint, icon=icon,
+                        focus=focus)
+
+    @classmethod
+    def pool_key(cls, color='dark-window', size_x=1.0, size_y=0.8, title=None, text=None, text_color='light',
+                 text_size=0.05, text_align=TextNode.ALeft, password=None, on_enter=None, entry_width=0.8, icon=None,
+                 icon_size=.05, hide_password=False, shadow=True, background_color=None, **kwargs):
+        """
+        Get the key of the pool a window created with these parameters belongs to. Windows of a pool share the same
+        layout, so that one of them can be reconfigured for any parameters with the same key
+
+        Returns:
+            a hashable key, or ``None`` if the window cannot be pooled
+        """
+        # windows of derived classes have their own content, which cannot be reconfigured
+        if cls is not Window:
+            return None
+        key = (cls, color, size_x, size_y, title is not None, text is not None, text_color, text_size, text_align,
+               password is not None, password is None and callable(on_enter), entry_width, icon is not None,
+               icon_size, hide_password, shadow, background_color)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def set_pool(self, pool):
+        """
+        Make the window pooled: once destroyed, it is hidden and added to the pool instead
+
+        Args:
+            pool (list): the pool of windows, or ``None`` to really destroy the window
+        """
+        self._pool = pool
+
+    def reconfigure(self, life_time=-1.0, title=None, text=None, pos=None, on_enter=None, password=None,
+                    on_password_find=None, on_password_fail=None, on_entry_add=None, on_entry_delete=None,
+                    entry_hint='', icon=None, focus=1, **kwargs):
+        """
+        Show a released window again with new content. Other parameters must match the ones of the window creation,
+        see :meth:`pool_key`
+        """
+        self._released = False
+        if self._background is not None:
+            self._background.show()
+        self._widget.show()
+        self._configure(life_time=life_time, title=title, text=text, pos=pos, on_enter=on_enter, password=password,
+                        on_password_find=on_password_find, on_password_fail=on_password_fail,
+                        on_entry_add=on_entry_add, on_entry_delete=on_entry_delete, entry_hint=entry_hint, icon=icon,
+                        focus=focus)
+
+    def _configure(self, life_time, title, text, pos, on_enter, password, on_password_find, on_password_fail,
+                   on_entry_add, on_entry_delete, entry_hint, icon, focus):
+        """
+        Set the content and the callbacks of the window
+        """
+        if pos is not None:
+            self.set_pos(pos[0], 0.0, pos[-1])
+        else:
+            self.set_pos(0.0, 0.0, 0.0)
+
+        if self._title is not None:
+            self._title.setText('\1title\1{}\2'.format(title.upper()))
+        if self._text is not None:
+            self._text.setText(text)
+
+        self._on_password_find = on_password_find
+        self._on_password_fail = on_password_fail
+        self._password = password
+
+        if self._entry is not None:
+            self._text_tooltip = entry_hint
             self._entry.enterText('\1hint\1{}\2'.format(self._text_tooltip))
-            self._entry.setTransparency(TransparencyAttrib.MAlpha)
+            self._entry['focus'] = focus
+            self._entry.setFocus()
 
-            if on_entry_add is not None:
-                self._entry.accept(self._entry.guiItem.getTypeEvent(),
-                                   lambda *args: on_entry_add(self.get_entry_text()))
-            if on_entry_delete is not None:
-                self._entry.accept(self._entry.guiItem.getEraseEvent(),
-                                   lambda *args: on_entry_delete(self.get_entry_text()))
+            for evt, callback in [(self._entry.guiItem.getTypeEvent(), on_entry_add),
+                                  (self._entry.guiItem.getEraseEvent(), on_entry_delete)]:
+                if callback is not None:
+                    self._entry.accept(evt, lambda *args, f=callback: f(self.get_entry_text()))
+                else:
+                    self._entry.ignore(evt)
 
             self._widget.ignore_all()
         elif callable(on_enter):
@@ -135,35 +234,112 @@ class Window(BaseWidget):
                                              'accepting')
             else:
                 self._widget.accept_once('enter', on_enter, extraArgs=[self])
-            OnscreenText(scale=0.05, parent=self._widget,
-                         pos=(0, -0.5 * size_y - 2 * self._widget_pad),
-                         text=self._gui_engine.process_text('$window_enter_to_close$'),
-                         fg=(1.0, 0.8, 0.7, 0.6)
-                         )
-        if icon is not None:
-            im = OnscreenImage(image=os.path.join(self._gui_engine.engine.get_option('icon_path'), '{}.png'.format(icon)),
-                               scale=icon_size,
-                               pos=(0.5 * self._size[0] - icon_size - self._widget_pad, 0.0,
-                                    0.5 * self._size[1] - icon_size - self._widget_pad),
-                               parent=self._widget)
+
+        if self._icon is not None:
+            if icon != self._icon_name:
+                self._gui_engine.textures.set_icon(self._icon, icon)
+                self._icon_name = icon
+            if self._icon_interval is not None:
+                self._icon_interval.finish()
+                self._icon_interval = None
+            self._icon.set_hpr(0, 0, 0)
             if icon == 'load_spinner':
-                im.hprInterval(2.0, Vec3(0, 0, 360)).loop()
+                self._icon_interval = self._gui_engine.play_interval(self._icon.hprInterval(2.0, Vec3(0, 0, 360)),
+                                                                     loop=True)
 
         if life_time is not None and life_time > 0.0:
             self._widget.doMethodLater(life_time, lambda *args: self.destroy(), 'remove_window')
-        if shadow:
-            self.set_shadow()
 
+        self._gui_engine.mark_dirty()
         self._gui_engine.engine.sound_manager.play_sfx('window_open')
 
     def get_node(self):
         return self._widget
 
+    def get_static_nodes(self, static_text: bool = False):
+        """
+        Get the nodes of the window that do not change once it is built, so that they can be flattened with the ones of
+        other widgets: its shadow, its frame if flat and its title, and its text only if ``static_text`` is set. The
+        frame and title are replaced by plain geometry, so they cannot be changed anymore, nor the text if it is static
+
+        Args:
+            static_text (bool): the text of the window is never updated
+
+        Returns:
+            a :obj:`list` with the shadow and frame nodes, drawn under other widgets, and a :obj:`list` with the title
+            and text nodes
+        """
+        back = [self._shadow] if self._shadow is not None else []
+        # the frame of the gui item is drawn apart, a flat one is replaced by a card of the same color
+        item = self._widget.guiItem
+        style = item.get_frame_style(0)
+        if style.get_type() == PGFrameStyle.T_flat and not style.has_texture():
+            cm = CardMaker('static_frame')
+            cm.set_frame(item.get_frame())
+            cm.set_color(style.get_color())
+            back.append(self._widget.attach_new_node(cm.generate()))
+            self._widget['relief'] = None
+
+        texts = []
+        if self._title is not None:
+            texts.append(self._generate_text(self._title))
+            self._title = None
+        if static_text and self._text is not None:
+            texts.append(self._generate_text(self._text))
+            self._text = None
+        return back, texts
+
+    @staticmethod
+    def _generate_text(text: OnscreenText) -> NodePath:
+        """
+        Replace a text by its geometry, which can be flattened with other nodes
+        """
+        node = text.get_parent().attach_new_node(text.textNode.generate())
+        node.set_transform(text.get_transform())
+        node.set_state(text.get_state())
+        text.destroy()
+        return node
+
+    def is_empty(self):
+        """
+        Tell if the window is destroyed or released to its pool
+        """
+        return self._released or self._widget.is_empty()
+
+    def release(self):
+        """
+        Hide the window and add it to its pool
+        """
+        if self._released:
+            return
+        self._released = True
+        if self._background is not None:
+            self._background.hide()
+        self._widget.ignore_all()
+        self._widget.remove_all_tasks()
+        if self._entry is not None:
+            self._entry['focus'] = 0
+            self._entry.setFocus()
+            self._entry.ignore(self._entry.guiItem.getTypeEvent())
+            self._entry.ignore(self._entry.guiItem.getEraseEvent())
+        if self._icon_interval is not None:
+            self._icon_interval.finish()
+            self._icon_interval = None
+        self._widget.hide()
+        self._pool.append(self)
+        self._gui_engine.mark_dirty()
+
     def destroy(self):
+        if self._pool is not None:
+            self.release()
+            return
+        if self._icon_interval is not None:
+            self._icon_interval.finish()
         if self._background is not None:
             self._background.remove_node()
         self._widget.ignore_all()
         self._widget.remove_all_tasks()
+        self._gui_engine.mark_dirty()
         super().destroy()
 
     def check(self, entry_text=None):
@@ -175,7 +351,7 @@ class Window(BaseWidget):
             if callable(self._on_password_find):
                 self._on_password_find(self)
             else:
-                self.remove_node()
+                self.destroy()
         else:
             self._gui_engine.engine.sound_manager.play_sfx('wrong')
             if callable(self._on_password_fail):
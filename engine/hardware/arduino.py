@@ -1,45 +1,187 @@
+import bisect
+import queue
+import threading
 import time
+from typing import Callable, Dict, List, Optional, Tuple
 
-from serial import Serial
+from serial import Serial, SerialException
 from serial.tools import list_ports
 
+from engine.utils.latency import latency_tracker
 from engine.utils.logger import Logger
 
 
-class WriteOnlyArduino:
+class ArduinoBoard:
     """
-    A class representing the read-only _arduino used to manage leds.
+    A single arduino board driving a range of leds. Messages are written to the serial port by a dedicated thread, so
+    that several boards are written in parallel and the caller never waits for the serial link.
     """
-    def __init__(self, engine):
-        self.task_mgr = engine.task_mgr
-
-        ports = list(list_ports.comports())
+    def __init__(self, name: str, first_led: int, baudrate: int = 9600):
+        self.name = name
+        self.first_led = first_led
         self.board = None
-        for p in ports:
+
+        for p in list_ports.comports():
             # Logger.info(p, p[2], 'description :', p.description)
-            if "ttyACM0" in p.description:
-                self.board = Serial(p[0], 9600, timeout=5)
+            if name in p.description or name == p.device:
+                self.board = Serial(p.device, baudrate, timeout=5)
+                break
 
         if self.board is None:
-            Logger.warning("no arduino board connected !")
+            Logger.warning(f'no arduino board connected on "{name}" !')
         else:
             if self.board.isOpen():
                 Logger.info("port is open. Closing it")
                 self.board.close()
 
-            Logger.info("opening the port for arduino connection")
+            Logger.info(f'opening the port for arduino connection on "{name}"')
             self.board.open()
 
+        # statistics
+        self._messages = 0
+        self._errors = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f'arduino_{name}', daemon=True)
+        self._thread.start()
+
+    @property
+    def is_connected(self) -> bool:
+        return self.board is not None and self.board.isOpen()
+
+    def send(self, s: str, on_written: Optional[Callable] = None) -> None:
+        """
+        Queue a message for this board
+
+        Args:
+            s (str): the message
+            on_written (:obj:`callable`, optional): function called from the writing thread once the message is written
+        """
+        if self.board is not None:
+            self._queue.put((time.perf_counter(), s, on_written))
+
+    def close(self) -> None:
+        """
+        Stop the writing thread and close the port
+        """
+        self._queue.put(None)
+        self._thread.join()
+        if self.is_connected:
+            self.board.close()
+
+    def status(self) -> Dict:
+        """
+        Get the health and latency of this board. Latency is the time between a message is sent and its writing on the
+        serial port is done
+
+        Returns:
+            a :obj:`dict`
+        """
+        return {
+            'connected': self.is_connected,
+            'pending': self._queue.qsize(),
+            'messages': self._messages,
+            'errors': self._errors,
+            'mean_latency': self._total_latency / self._messages if self._messages > 0 else 0.0,
+            'max_latency': self._max_latency,
+        }
+
+    def reset_status(self) -> None:
+        """
+        Reset board statistics
+        """
+        self._messages = 0
+        self._errors = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            t0, message, on_written = item
+            try:
+                self.board.write(str.encode(message))
+            except SerialException as e:
+                self._errors += 1
+                Logger.error(f'error while writing on arduino "{self.name}": {e}')
+                continue
+            latency = time.perf_counter() - t0
+            self._messages += 1
+            self._total_latency += latency
+            self._max_latency = max(self._max_latency, latency)
+            if on_written is not None:
+                on_written()
+
+
+class WriteOnlyArduino:
+    """
+    A class representing the read-only _arduino used to manage leds. Leds may be spread over several boards, each board
+    driving leds from its first led id to the first led id of the next board.
+    """
+    def __init__(self, engine):
+        self.task_mgr = engine.task_mgr
+
+        # boards, sorted by their first led id
+        boards = engine.get_option('led_boards') or {'ttyACM0': 0}
+        self._boards: List[ArduinoBoard] = [
+            ArduinoBoard(name, first_led, baudrate=engine.get_option('led_board_baudrate'))
+            for name, first_led in sorted(boards.items(), key=lambda x: x[1])
+        ]
+        self._first_leds = [board.first_led for board in self._boards]
+
         time.sleep(1.0)
         self.all_off()
 
     @property
     def is_connected(self) -> bool:
-        return self.board is not None and self.board.isOpen()
+        return any(board.is_connected for board in self._boards)
 
     def __exit__(self, **kwargs):
-        if self.board.isOpen():
-            self.board.close()
+        self.close()
+
+    def close(self):
+        """
+        Close all boards
+        """
+        for board in self._boards:
+            board.close()
+
+    def status(self) -> Dict[str, Dict]:
+        """
+        Get the health and latency of all boards
+
+        Returns:
+            a :obj:`dict` with board names as keys
+        """
+        return {board.name: board.status() for board in self._boards}
+
+    def reset_status(self) -> None:
+        """
+        Reset statistics of all boards
+        """
+        for board in self._boards:
+            board.reset_status()
+
+    def _shard(self, led_id) -> Tuple[Optional[ArduinoBoard], int]:
+        """
+        Find the board driving a led
+
+        Returns:
+            the board and the id of the led on this board, or ``None`` and the given id if there is none
+        """
+        if led_id is None or not str(led_id).strip().isdigit():
+            Logger.error(f'invalid led id "{led_id}"')
+            return None, led_id
+        led_id = int(led_id)
+        i = bisect.bisect_right(self._first_leds, led_id) - 1
+        if i < 0:
+            Logger.error(f'no arduino board for led {led_id}')
+            return None, led_id
+        return self._boards[i], led_id - self._first_leds[i]
 
     def hello_world(self):
         """
@@ -54,33 +196,42 @@ class WriteOnlyArduino:
 
     def send(self, s):
         """
-        Sends a message to the _arduino
+        Sends a message to all boards
         @param s: te message
         """
-        if self.board is not None:
-            self.board.write(str.encode(str(s.strip())))
+        for board in self._boards:
+            board.send(str(s).strip())
+
+    def send_frame(self, frame: Dict[str, bool]) -> None:
+        """
+        Sends the values of several leds, with a single message per board
+
+        Args:
+            frame (dict): led ids and their values
+        """
+        messages = dict()
+        for led, value in frame.items():
+            board, local_id = self._shard(led)
+            if board is not None:
+                messages.setdefault(board, []).append(f"<{local_id}-{int(value)}>")
+        trace = latency_tracker.current
+        for board, message in messages.items():
+            board.send(''.join(message),
+                       on_written=(lambda: latency_tracker.mark(trace, 'led')) if trace is not None else None)
 
     def led_on(self, id):
         """
         Switches led(s) on
         @param id: the id(s) of the desired led(s). Can be an int or a list of int.
         """
-        if isinstance(id, list):
-            for i in id:
-                self.send(f"<{i}'-1>")
-        else:
-            self.send(f"<{id}-1>")
+        self.send_frame({i: True for i in (id if isinstance(id, list) else [id])})
 
     def led_off(self, id):
         """
         Switches led(s) off
         @param id: the id(s) of the desired led(s). Can be an int or a list of int.
         """
-        if isinstance(id, list):
-            for i in id:
-                self.send(f"<{i}-0>")
-        else:
-            self.send(f"<{id}-0>")
+        self.send_frame({i: False for i in (id if isinstance(id, list) else [id])})
 
     def all_on(self):
         """
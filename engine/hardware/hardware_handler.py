@@ -1,15 +1,104 @@
-from typing import Union, Any
+import csv
+import re
+from dataclasses import dataclass
+from typing import Union, Any, Dict, List, Optional, Tuple
 
 import pygame
+from direct.task.Task import Task
+from engine.game_state import GameStateManager, GameState, StateType
 from engine.utils.event_handler import EventObject, event
-from direct.showbase.MessengerGlobal import messenger
+from engine.utils.latency import latency_tracker
 from direct.showbase.ShowBase import ShowBase
 
 from engine.hardware.arduino import WriteOnlyArduino
+from engine.hardware.led_animator import LedAnimator
 from engine.utils.logger import Logger
 
 
+@dataclass
+class HardwareInput:
+    """
+    An entry of the hardware dispatch table, linking a physical input to its :class:`GameState` objects. An input
+    mapped to several states in the hardware file updates all of them
+    """
+    name: str
+    states: List[GameState]
+    time: float = 0.0
+    task: Optional[Task] = None
+
+
+@dataclass
+class AxisFilter:
+    """
+    Filter turning raw joystick axis values into ``-1``, ``0`` or ``1``, with a dead zone, an hysteresis band around
+    ``0.5`` and a maximum update rate
+    """
+    dead_zone: float
+    hysteresis: float
+    min_interval: float
+    value: int = 0
+    pending: Optional[int] = None
+    last_update: float = float('-inf')
+
+    def filter(self, raw: float, t: float) -> Optional[int]:
+        """
+        Filter a raw axis value
+
+        Args:
+            raw (float): the raw value, between -1 and 1
+            t (float): current time in seconds
+
+        Returns:
+            the new axis value if it changed and can be updated now, ``None`` otherwise
+        """
+        magnitude = abs(raw)
+        sign = 1 if raw > 0 else -1
+        if magnitude <= self.dead_zone:
+            target = 0
+        elif magnitude >= 0.5 + self.hysteresis:
+            target = sign
+        elif magnitude < 0.5 - self.hysteresis:
+            target = 0
+        else:
+            # inside the hysteresis band, keep the current value
+            target = self.value if self.value in (0, sign) else 0
+
+        if target == self.value:
+            self.pending = None
+            return None
+        if t - self.last_update < self.min_interval:
+            # too early, this value will be applied by `flush`
+            self.pending = target
+            return None
+        return self._update(target, t)
+
+    def flush(self, t: float) -> Optional[int]:
+        """
+        Apply the value that was delayed by the rate limit, if it is time to do so
+
+        Args:
+            t (float): current time in seconds
+
+        Returns:
+            the new axis value if any, ``None`` otherwise
+        """
+        if self.pending is not None and t - self.last_update >= self.min_interval:
+            return self._update(self.pending, t)
+        return None
+
+    def _update(self, value: int, t: float) -> int:
+        self.value = value
+        self.pending = None
+        self.last_update = t
+        return value
+
+
 class HardwareHandler(EventObject):
+    # hardware keys are formatted as "joystick<j>-button<b>" or "joystick<j>-axis<a>"
+    _hardware_key_regex = re.compile(r'^joystick(\d+)-(button|axis)(\d+)$')
+    # ids in the hardware file are prefixed with the kind of state, e.g. "s_" for switches
+    _state_prefix_regex = re.compile(r'^[a-z]_')
+
     def __init__(self, engine):
         super().__init__()
         pygame.init()
@@ -18,6 +107,10 @@ class HardwareHandler(EventObject):
 
         # looking for Arduino
         self._arduino = WriteOnlyArduino(self.engine)
+        self._led_animator = LedAnimator(self._arduino,
+                                         rate=self.engine.get_option('led_animation_rate'),
+                                         default_period=self.engine.get_option('led_animation_period'))
+        self._led_animator.start()
 
         self._joysticks = []
         for i in range(pygame.joystick.get_count()):
@@ -26,18 +119,96 @@ class HardwareHandler(EventObject):
                 self._joysticks.append(pygame.joystick.Joystick(i))
                 self._joysticks[-1].init()
 
-        # ghost firewall
-        self.times = dict()
-        self.tasks = dict()
-        self._axes_value = dict()
+        # dispatch tables, from (joystick, button) and (joystick, axis) to game states
+        self._buttons: Dict[Tuple[int, int], HardwareInput] = dict()
+        self._axes: Dict[Tuple[int, int], HardwareInput] = dict()
+        self._axis_filters: Dict[Tuple[int, int], AxisFilter] = dict()
+        self._compile_dispatch_table(self.engine.get_option('hardware_file'))
+
+        # raw axis events statistics, for the current session
+        self._axis_events_received = 0
+        self._axis_events_discarded = 0
 
+        # ghost firewall
         # self.firewall_time = 0.05
         self.firewall_time = self.engine.get_option('hardware_input_firewall_time')
 
-        # for j in range(3):
-        #     for b in range(10):
-        #         self.times[f'joystick{j}-button{b}'] =
-        #         self.tasks[f'joystick{j}-button{b}'] = None
+    def _compile_dispatch_table(self, file_name: str) -> None:
+        """
+        Build the dispatch tables from the hardware file. Each row with a hardware key is linked to the game state
+        named after its id (without its prefix). A key found in several rows updates all their states. Input states
+        without any key are reported.
+
+        Args:
+            file_name (str): path to the hardware file (csv)
+        """
+        try:
+            with open(file_name, 'r', encoding='utf-8') as file:
+                rows = list(csv.DictReader(file))
+        except FileNotFoundError:
+            Logger.error(f'hardware file "{file_name}" does not exists, no hardware input will be handled')
+            return
+
+        bound = set()
+        for row in rows:
+            match = self._hardware_key_regex.match(row['hardware_key'] or '')
+            if match is None:
+                # leds, software states or unplugged inputs
+                continue
+
+            name = self._state_prefix_regex.sub('', row['id'])
+            if name not in GameStateManager.states():
+                Logger.error(f'hardware key "{row["hardware_key"]}" is mapped to an unknown state "{name}"')
+                continue
+
+            joystick, kind, index = match.groups()
+            table = self._buttons if kind == 'button' else self._axes
+            key = (int(joystick), int(index))
+            bound.add(name)
+            if key in table:
+                Logger.info(f'hardware key "{row["hardware_key"]}" shared by "{table[key].name}" and "{name}"')
+                table[key].name += f', {name}'
+                table[key].states.append(GameStateManager.get_state(name))
+                continue
+
+            Logger.info(f'saving hardware key {row["hardware_key"]} for state {name}')
+            table[key] = HardwareInput(name=name, states=[GameStateManager.get_state(name)])
+            if kind == 'axis':
+                max_rate = self._axis_option('axis_max_rate', row['hardware_key'])
+                self._axis_filters[key] = AxisFilter(
+                    dead_zone=self._axis_option('axis_dead_zone', row['hardware_key']),
+                    hysteresis=self._axis_option('axis_hysteresis', row['hardware_key']),
+                    min_interval=1.0 / max_rate if max_rate else 0.0
+                )
+
+        inputs = (StateType.BUTTON, StateType.SWITCH, StateType.JOYSTICK)
+        for name, state in GameStateManager.states().items():
+            if state.state_type in inputs and name not in bound:
+                Logger.info(f'no hardware key for input state "{name}" in "{file_name}"')
+
+    def _axis_option(self, name: str, hardware_key: str) -> float:
+        """
+        Get an axis option. It can be set either as a single value for all axes or as a dictionary mapping hardware keys
+        to values, e.g. ``{joystick2-axis0: 0.2, default: 0.1}``
+
+        Args:
+            name (str): name of the option
+            hardware_key (str): the hardware key of the axis
+
+        Returns:
+            the value of the option for this axis
+        """
+        option = self.engine.get_option(name)
+        if isinstance(option, dict):
+            return option.get(hardware_key, option.get('default', 0.0))
+        return option if option is not None else 0.0
+
+    @property
+    def axis_statistics(self) -> Dict[str, int]:
+        """
+        Number of raw axis events received and discarded since the last reset
+        """
+        return {'received': self._axis_events_received, 'discarded': self._axis_events_discarded}
 
     @event('enable_hardware')
     def enable_inputs(self) -> None:
@@ -61,15 +232,38 @@ class HardwareHandler(EventObject):
 
     def reset(self):
         """
-        Set all leds off and register events from game states
+        Set all leds off and reset the ghost firewall of all inputs
         """
+        self._led_animator.clear()
         self._arduino.all_off()
-        for item in self.engine.state_manager.states().values():
-            event_name = item.hardware_key
-            if event_name is not None:
-                Logger.info(f'saving event {event_name} in hardware register')
-                self.times[event_name] = self.engine.get_time(round_result=False)
-                self.tasks[event_name] = None
+        t0 = self.engine.get_time(round_result=False)
+        for entry in (*self._buttons.values(), *self._axes.values()):
+            entry.time = t0
+            entry.task = None
+        for axis in self._axis_filters.values():
+            # clock has been reset, so has the rate limit
+            axis.last_update = float('-inf')
+
+        if self._axis_events_received > 0:
+            Logger.info(f'{self._axis_events_discarded} / {self._axis_events_received} raw axis events discarded '
+                        f'during last session')
+        self._axis_events_received = 0
+        self._axis_events_discarded = 0
+
+        for name, status in self._arduino.status().items():
+            if status['messages'] > 0 or status['errors'] > 0:
+                Logger.info(f'arduino board "{name}" (connected: {status["connected"]}): '
+                            f'{status["messages"]} messages, {status["errors"]} errors, '
+                            f'latency {1000 * status["mean_latency"]:.1f} ms '
+                            f'(max {1000 * status["max_latency"]:.1f} ms)')
+        self._arduino.reset_status()
+
+    @property
+    def board_statistics(self) -> Dict[str, Dict]:
+        """
+        Health and writing latency of each arduino board since the last reset
+        """
+        return self._arduino.status()
 
     def all_leds_on(self):
         """
@@ -107,68 +301,127 @@ class HardwareHandler(EventObject):
         """
         self._arduino.led_off(led_id)
 
+    def animate_leds(self, name: str, led_ids: List[Union[int, str]], pattern: str = 'blink',
+                     period: Optional[float] = None) -> None:
+        """
+        Start a led animation. Leds are updated from a separate thread until :func:`stop_led_animation` is called
+
+        Args:
+            name (str): the name of the animation
+            led_ids (list): the *ids* of the leds
+            pattern (str): one of ``'blink'``, ``'pulse'`` or ``'chase'``
+            period (:obj:`float`, optional): duration of one cycle of the pattern, in seconds
+        """
+        self._led_animator.animate(name, led_ids, pattern=pattern, period=period)
+
+    def stop_led_animation(self, name: str, value: bool = False) -> None:
+        """
+        Stop a led animation
+
+        Args:
+            name (str): the name of the animation
+            value (bool): the value of the leds once stopped
+        """
+        self._led_animator.stop_animation(name, value=value)
+
+    def is_led_animated(self, name: str) -> bool:
+        """
+        Check if a led animation is running
+
+        Args:
+            name (str): the name of the animation
+        """
+        return self._led_animator.is_animated(name)
+
     def destroy(self):
         """
         Destroy this class
         """
+        self._led_animator.stop()
+        self._arduino.close()
         pygame.quit()
 
     def _event_polling(self, task):
+        t0 = self.engine.get_time(round_result=False)
 
         for ev in pygame.event.get():
-            event_name = ""
-            value = None
-            axis_moved = True
-            if ev.type == pygame.JOYBUTTONDOWN or ev.type == pygame.JOYBUTTONUP:
-                event_name = 'joystick%d-button%d' % (ev.joy, ev.button)
-                value = ev.type == pygame.JOYBUTTONDOWN
-            elif ev.type == pygame.JOYAXISMOTION:
-                event_name = 'joystick%d-axis%d' % (ev.joy, ev.axis)
+            if ev.type == pygame.JOYAXISMOTION:
+                # axes are noisy and may flood the queue, check them first
+                # and drop them as soon as possible
+                self._axis_events_received += 1
+                key = (ev.joy, ev.axis)
+                axis = self._axis_filters.get(key, None)
                 # value should be [-1, 0, 1]
-                value = round(ev.value)
-                # only trigger an event if axes changed value
-                # as in 0 to 1 or -1 to 0 etc
-                axis_moved = value != self._axes_value.get(event_name, 0)
-                # store this value for next comparison
-                self._axes_value[event_name] = value
-
-            if len(event_name) > 0 and axis_moved and event_name in self.times:
-                # try to avoid repetition of the same
-                # event in a short time. We start by
-                # computing time delta from previous
-                # record of the same event
-                t0 = self.engine.get_time(round_result=False)
-                dt = t0 - self.times[event_name]
-                # we store event time in corresponding
-                # event
-                self.times[event_name] = t0
-
-                if dt > self.firewall_time:
-                    # if delta is larger than
-                    # firewall_time, we send an event in
-                    # 1.1 * firewall_time
-                    # the risk is that the same event is fired
-                    # a few µs latter, hence the event is
-                    # effectively sent after firewall_time
-                    Logger.info(f'sending event "{event_name}" in {self.firewall_time} seconds')
-                    self.tasks[event_name] = self.engine.task_mgr.do_method_later(
-                        1.1 * self.firewall_time,
-                        self._process_event,
-                        extraArgs=[event_name, value],
-                        name=event_name
-                    )
-
-                elif self.tasks[event_name] is not None:
-                    # the same event was fired just before,
-                    # we consider that this event and the previous
-                    # one are ghost. We remove the task
-                    Logger.warning(f"possible ghost from {event_name} with value {value}.")
-                    self.tasks[event_name].remove()
+                value = axis.filter(ev.value, t0) if axis is not None else None
+                if value is None:
+                    self._axis_events_discarded += 1
+                    continue
+                self._fire(self._axes[key], value, t0)
+            elif ev.type == pygame.JOYBUTTONDOWN or ev.type == pygame.JOYBUTTONUP:
+                entry = self._buttons.get((ev.joy, ev.button), None)
+                if entry is not None:
+                    self._fire(entry, ev.type == pygame.JOYBUTTONDOWN, t0)
+
+        # apply axes values delayed by their rate limit
+        for key, axis in self._axis_filters.items():
+            value = axis.flush(t0)
+            if value is not None:
+                self._fire(self._axes[key], value, t0)
         return task.cont
 
+    def _fire(self, entry: HardwareInput, value: Any, t0: float) -> None:
+        """
+        Update the state of an input, going through the ghost firewall
+
+        Args:
+            entry (HardwareInput): the input
+            value (Any): its new value
+            t0 (float): current time
+        """
+        # try to avoid repetition of the same
+        # event in a short time. We start by
+        # computing time delta from previous
+        # record of the same event
+        dt = t0 - entry.time
+        # we store event time in corresponding
+        # entry
+        entry.time = t0
+
+        if dt > self.firewall_time:
+            # if delta is larger than
+            # firewall_time, we update the state in
+            # 1.1 * firewall_time
+            # the risk is that the same event is fired
+            # a few µs latter, hence the event is
+            # effectively sent after firewall_time
+            Logger.info(f'updating state "{entry.name}" in {self.firewall_time} seconds')
+            entry.task = self.engine.task_mgr.do_method_later(
+                1.1 * self.firewall_time,
+                self._process_input,
+                extraArgs=[entry, value, latency_tracker.start(entry.name)],
+                name='hardware_input'
+            )
+
+        elif entry.task is not None:
+            # the same event was fired just before,
+            # we consider that this event and the previous
+            # one are ghost. We remove the task
+            Logger.warning(f"possible ghost from {entry.name} with value {value}.")
+            entry.task.remove()
+
     @staticmethod
-    def _process_event(event_name: str, value: Any) -> None:
-        messenger.send(event_name, sentArgs=[value])
+    def _process_input(entry: HardwareInput, value: Any, trace) -> None:
+        """
+        Update the state of an input once it passed the firewall
+        """
+        latency_tracker.mark(trace, 'firewall')
+        latency_tracker.current = trace
+        try:
+            for state in entry.states:
+                state.set_value_from_hardware(value)
+        finally:
+            latency_tracker.current = None
+        latency_tracker.mark(trace, 'set_value')
 
 
 if __name__ == '__main__':
@@ -180,6 +433,10 @@ if __name__ == '__main__':
             self.arduino.led_on('54')
             # self.arduino.led_on('55')
 
+        @staticmethod
+        def get_option(key):
+            return {'led_boards': {'ttyACM0': 0}, 'led_board_baudrate': 9600}.get(key, None)
+
 
     main = Test()
     # main.run()
@@ -0,0 +1,150 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+from engine.utils.logger import Logger
+
+
+# a pattern tells if the led number `index` among `count` leds is on at a given `phase`, between 0 and 1
+PATTERNS: Dict[str, Callable[[float, int, int], bool]] = {
+    # all leds on during the first half of the period
+    'blink': lambda phase, index, count: phase < 0.5,
+    # two short flashes per period, as a heartbeat
+    'pulse': lambda phase, index, count: phase < 0.1 or 0.2 <= phase < 0.3,
+    # one led on after each other
+    'chase': lambda phase, index, count: int(phase * count) == index,
+}
+
+
+@dataclass
+class LedAnimation:
+    """
+    An animation running on one or several leds
+    """
+    leds: List[str]
+    pattern: Callable[[float, int, int], bool]
+    period: float
+    start_time: float
+
+    def frame(self, t: float) -> Dict[str, bool]:
+        """
+        Compute the leds values at time `t`
+        """
+        phase = ((t - self.start_time) % self.period) / self.period
+        count = len(self.leds)
+        return {led: self.pattern(phase, i, count) for i, led in enumerate(self.leds)}
+
+
+class LedAnimator:
+    """
+    Animates leds from a timer thread. At a fixed rate, the frame of all running animations is computed and only the
+    leds whose value changed since last frame are sent to the board.
+    """
+    def __init__(self, arduino, rate: float = 20.0, default_period: float = 1.0):
+        self._arduino = arduino
+        self._dt = 1.0 / rate
+        self._default_period = default_period
+
+        self._animations: Dict[str, LedAnimation] = dict()
+        # values sent to the board by this thread
+        self._sent: Dict[str, bool] = dict()
+
+        self._lock = threading.Lock()
+        self._running = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='led_animator', daemon=True)
+
+    def start(self) -> None:
+        """
+        Start the animation thread
+        """
+        self._running.set()
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the animation thread
+        """
+        self._running.clear()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def animate(self, name: str, leds: List[str], pattern: str = 'blink', period: float = None) -> None:
+        """
+        Start an animation, replacing any animation with the same name
+
+        Args:
+            name (str): name of the animation
+            leds (list[str]): ids of the animated leds
+            pattern (str): one of ``'blink'``, ``'pulse'`` or ``'chase'``
+            period (:obj:`float`, optional): duration of one cycle of the pattern, in seconds
+        """
+        if pattern not in PATTERNS:
+            Logger.error(f'unknown led pattern "{pattern}"')
+            return
+
+        with self._lock:
+            self._animations[name] = LedAnimation(
+                leds=[str(led) for led in leds],
+                pattern=PATTERNS[pattern],
+                period=period if period is not None else self._default_period,
+                start_time=time.monotonic()
+            )
+            for led in self._animations[name].leds:
+                # the led may have been updated outside of this thread
+                self._sent.pop(led, None)
+
+    def stop_animation(self, name: str, value: bool = False) -> None:
+        """
+        Stop an animation and set its leds to a final value. The final value is sent at once, so that the leds can be
+        updated right after from another thread
+
+        Args:
+            name (str): name of the animation
+            value (bool): the value of the leds once the animation is stopped
+        """
+        with self._lock:
+            animation = self._animations.pop(name, None)
+            if animation is not None:
+                for led in animation.leds:
+                    self._sent.pop(led, None)
+                self._arduino.send_frame({led: value for led in animation.leds})
+
+    def is_animated(self, name: str) -> bool:
+        """
+        Check if an animation is running
+        """
+        return name in self._animations
+
+    def clear(self) -> None:
+        """
+        Stop all animations, leaving the leds as they are
+        """
+        with self._lock:
+            self._animations.clear()
+            self._sent.clear()
+
+    def _run(self) -> None:
+        next_tick = time.monotonic()
+        while self._running.is_set():
+            try:
+                self._tick()
+            except Exception as e:
+                # a bad frame must not stop all animations
+                Logger.error(f'led animation frame failed: {e}')
+
+            next_tick += self._dt
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+
+    def _tick(self) -> None:
+        with self._lock:
+            frame = dict()
+            t = time.monotonic()
+            for animation in self._animations.values():
+                frame.update(animation.frame(t))
+
+            diff = {led: value for led, value in frame.items() if self._sent.get(led, None) != value}
+            if len(diff) > 0:
+                # remember the values first, so that a failing frame is not sent again on every tick
+                self._sent.update(diff)
+                self._arduino.send_frame(diff)
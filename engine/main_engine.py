@@ -1,4 +1,6 @@
 import datetime
+from collections import deque
+from itertools import islice
 from math import sqrt
 from typing import Any
 
@@ -25,12 +27,14 @@ from engine.scenario.scenario_handler import Scenario
 from engine.shuttle.shuttle_frame import ShuttleFrame
 from engine.sound.sound_manager import SoundManager
 from engine.utils.ini_parser import ParamUtils
-from engine.utils.logger import Logger
+from engine.utils.latency import latency_tracker
+from engine.utils.logger import Logger, start_logging
 
 
 class Game(ShowBase):
     def __init__(self, param_file, default_param_file):
         ShowBase.__init__(self)
+        start_logging()
 
         # splashscreen
         props = WindowProperties()
@@ -190,12 +194,16 @@ class Game(ShowBase):
                 align=TextNode.ALeft,
                 parent=self.a2dTopLeft
             )
-            self.debug_logs = []
+            # only the last logs are kept, the window is redrawn at most once per frame when logs changed
+            self.debug_logs = deque(maxlen=self.get_option('debug_log_capacity'))
+            self._debug_log_dirty = False
             self.log_shift = 0
             self.log_size = 30
+            self.show_latency = False
             self.debug_window.setBin('gui-popup', 1)
             self.accept('control-l', self.toggle_debug_window)
-            self.accept('log_event', self.on_log_event)
+            self.accept('control-k', self.toggle_latency_report)
+            self.accept('log_events', self.on_log_events)
             self.accept('wheel_up', self.on_wheel_up)
             self.accept('wheel_down', self.on_wheel_down)
 
@@ -203,6 +211,10 @@ class Game(ShowBase):
                 self.debug_window.show()
             else:
                 self.debug_window.hide()
+            self.add_task(self._update_debug_window, 'debug_window')
+
+            if self.get_option('measure_latency'):
+                latency_tracker.enable(self)
 
             self.reset_game()
 
@@ -212,8 +224,28 @@ class Game(ShowBase):
         """
         if self.debug_window.is_hidden():
             self.debug_window.show()
+            self.draw_log()
         else:
             self.debug_window.hide()
+            self.gui.mark_dirty()
+
+    def toggle_latency_report(self) -> None:
+        """
+        Show or hide the input latency report in the debug window, instead of logs
+        """
+        self.show_latency = not self.show_latency
+        if self.show_latency:
+            self.debug_window.show()
+            self.do_method_later(0.0, self._draw_latency_report, 'latency_report')
+        else:
+            self.remove_task('latency_report')
+            self.draw_log()
+
+    def _draw_latency_report(self, task):
+        self.debug_window.setText(f'input latency (ms)\n{latency_tracker.report()}')
+        self.gui.mark_dirty()
+        task.delayTime = 0.5
+        return task.again
 
     def on_wheel_down(self, *args) -> None:
         """
@@ -226,31 +258,39 @@ class Game(ShowBase):
         """
         Listen to mouse wheel up event and shift logs accordingly
         """
-        self.log_shift += 1
+        self.log_shift = min(self.log_shift + 1, max(len(self.debug_logs) - 1, 0))
         self.draw_log()
 
     def draw_log(self):
         """
-        Draw logs on the debug window
+        Draw logs on the debug window, on next frame
         """
-        self.debug_window.setText('\n'.join(self.debug_logs[-self.log_size - self.log_shift: - 1 - self.log_shift]))
+        self._debug_log_dirty = True
+
+    def _update_debug_window(self, task):
+        if self._debug_log_dirty and not self.show_latency and not self.debug_window.is_hidden():
+            end = len(self.debug_logs) - self.log_shift
+            self.debug_window.setText('\n'.join(islice(self.debug_logs, max(end - self.log_size, 0), end)))
+            self.gui.mark_dirty()
+            self._debug_log_dirty = False
+        return task.cont
 
-    def on_log_event(self, level, message) -> None:
+    def on_log_events(self, records) -> None:
         """
-        Triggered when anything is logged in logging module.
+        Triggered once per frame with the records logged in logging module since the previous frame.
         Update the log debug window
 
         Args:
-            level (str): message level
-            message (str): message
+            records (list): levels and messages of the records
         """
-        if level == 'WARNING':
-            message = f'\1orange\1{message}\2'
-        elif level == 'ERROR':
-            message = f'\1red\1{message}\2'
-        self.debug_logs.append(message)
+        for level, message in records:
+            if level == 'WARNING':
+                message = f'\1orange\1{message}\2'
+            elif level == 'ERROR':
+                message = f'\1red\1{message}\2'
+            self.debug_logs.append(message)
         self.log_shift = 0
-        self.draw_log()
+        self._debug_log_dirty = True
 
     def get_option(self, key, default=False):
         """
@@ -341,6 +381,9 @@ class Game(ShowBase):
         # ignore step fulfill
         self.ignore(self.get_option('force_step_key'))
 
+        if latency_tracker.enabled:
+            latency_tracker.dump(self.get_option('latency_file'))
+
         self.clock.reset()
         self.sound_manager.reset()
         self.hardware.reset()
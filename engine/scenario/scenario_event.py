@@ -1,6 +1,7 @@
 import inspect
 from typing import List
 
+from engine.sound.voice_scheduler import VoiceScheduler
 from engine.utils.event_handler import send_event
 from engine.utils.logger import Logger
 
@@ -88,14 +89,15 @@ class ScenarioStep:
         """
         Start this step
         """
-        Logger.info('')
-        Logger.info(f'starting step "{self.name}" (id "{self.id}", starts in {self.delay:.2f} seconds)')
-        Logger.info(f'\t- blocking \t\t: {self._blocking}')
-        Logger.info(f'\t- delay \t\t: {self.delay:.2f} seconds')
-        Logger.info(f'\t- duration \t\t: {self.duration if self.duration is not None else "infinity"} seconds.')
-        Logger.info(f'\t- conditions\t: {self.constraints}')
-        Logger.info(f'\t- event name\t: {self._event_name}')
-        Logger.info(f'\t- event args\t: {self._event_kwargs}')
+        if Logger.is_enabled_for(Logger.INFO):
+            Logger.info('')
+            Logger.info(f'starting step "{self.name}" (id "{self.id}", starts in {self.delay:.2f} seconds)')
+            Logger.info(f'\t- blocking \t\t: {self._blocking}')
+            Logger.info(f'\t- delay \t\t: {self.delay:.2f} seconds')
+            Logger.info(f'\t- duration \t\t: {self.duration if self.duration is not None else "infinity"} seconds.')
+            Logger.info(f'\t- conditions\t: {self.constraints}')
+            Logger.info(f'\t- event name\t: {self._event_name}')
+            Logger.info(f'\t- event args\t: {self._event_kwargs}')
 
         if self.constraints is None and self.duration is None and self._blocking:
             Logger.warning('this step has no end conditions nor max time')
@@ -128,7 +130,7 @@ class ScenarioStep:
             # if set
             self._hint_task = self.scenario.event_manager.add_event(
                 time=self.delay + self._hint_time,
-                method=lambda *args: self.engine.sound_manager.play_sfx(self._hint_sound)
+                method=lambda *args: self.engine.sound_manager.play_sfx(self._hint_sound, priority=VoiceScheduler.HINT)
             )
 
         if not self._blocking:
@@ -160,7 +162,9 @@ class ScenarioStep:
         Returns
             a :obj:`bool`
         """
-        Logger.info(f'checking is step {self.name} can end')
+        verbose = Logger.is_enabled_for(Logger.INFO)
+        if verbose:
+            Logger.info(f'checking is step {self.name} can end')
         if self._next_step_started or not self._blocking:
             # This step has already been stopped
             # somewhere else (in start for example).
@@ -168,28 +172,61 @@ class ScenarioStep:
             # by `update_scenario`, triggered by some
             # game state update. Since we don't want to stop
             # current step, we simply return False
-            Logger.info('-> Cannot end since already ended')
+            if verbose:
+                Logger.info('-> Cannot end since already ended')
             return False
         if self.constraints is not None:
             for key in self.constraints:
                 value = self.constraints[key]
                 game_value = self.engine.state_manager.get_state(key).get_value()
                 if value != game_value:
-                    Logger.info('-> Cannot end since constrain not fulfilled')
+                    if verbose:
+                        Logger.info('-> Cannot end since constrain not fulfilled')
                     return False
             return True
         if wait_end_if_fulfilled:
             res = self._end_task is None or not self.scenario.event_manager.is_event_alive(self._end_task)
             if res:
-                Logger.info('-> Can end since task ended')
+                if verbose:
+                    Logger.info('-> Can end since task ended')
                 return True
             else:
-                Logger.info('-> Cannot end since task not ended')
+                if verbose:
+                    Logger.info('-> Cannot end since task not ended')
                 return False
         else:
-            Logger.info('-> Can end task')
+            if verbose:
+                Logger.info('-> Can end task')
             return True
 
+    @property
+    def sound_names(self) -> List[str]:
+        """
+        get a list of all sfx names this step may play
+        """
+        names = [
+            self._win_sound,
+            self._loose_sound,
+            self._hint_sound,
+            self._event_kwargs.get('name', None) if self._event_name == 'play_sound' else None
+        ]
+        return [str(k) for k in names if k is not None]
+
+    @property
+    def music_names(self) -> List[str]:
+        """
+        get a list of all music names this step may play
+        """
+        name = self._event_kwargs.get('name', None) if self._event_name == 'play_music' else None
+        return [str(name)] if name is not None else []
+
+    @property
+    def state_names(self) -> List[str]:
+        """
+        get a list of all game states this step waits for
+        """
+        return list(self.constraints.keys()) if self.constraints is not None else []
+
     @property
     def event_names(self) -> List:
         """
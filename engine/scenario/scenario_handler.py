@@ -1,6 +1,7 @@
 import datetime
 import inspect
 import re
+from typing import Set, Tuple
 
 from direct.showbase.DirectObject import DirectObject
 from panda3d.core import LVector3f, WindowProperties
@@ -116,9 +117,10 @@ class Scenario(EventObject):
                     # default duration o sound length + 1 second
                     duration = self.engine.sound_manager.get_sound_length(args_dict.get("name", None)) + 1.0
 
-                elif action in ["shuttle_stop", "led_off", "led_on", "start_game", "show_score",
-                                "set_screen", "stop_sound", "sound_volume", "disable_hardware", "play_music",
-                                "enable_hardware"] and duration is None:
+                elif action in ["shuttle_stop", "led_off", "led_on", "led_animation", "stop_led_animation",
+                                "start_game", "show_score",
+                                "set_screen", "stop_sound", "sound_volume", "ambient_sounds", "disable_hardware",
+                                "play_music", "enable_hardware"] and duration is None:
                     # these actions have a default duration to 0.0
                     duration = 0.0
 
@@ -293,9 +295,35 @@ class Scenario(EventObject):
                             current["end_conditions"] = dict()  # noqa
                         current["end_conditions"][args.get("key", None)] = args.get("value", None)
 
+            # keep sounds of this scenario in memory, and only them
+            self.engine.sound_manager.preload(*self.get_sound_names())
+
         except FileNotFoundError:
             Logger.error('Error while loading file {}. It does not exists !'.format(name))
 
+    def get_sound_names(self) -> Tuple[Set[str], Set[str]]:
+        """
+        Get all sounds the current scenario may play: sounds of its steps, sounds played when a game state it
+        touches is switched on or off, and sounds played by the engine itself (``engine_sounds`` and
+        ``critical_sounds`` params). Once hardware is enabled, any state may be switched by the players.
+
+        Returns:
+            the names of sfx and the names of musics
+        """
+        sfx_names = {name for step in self.steps for name in step.sound_names}
+        music_names = {name for step in self.steps for name in step.music_names}
+
+        if any(step.name == 'enable_hardware' for step in self.steps):
+            states = self.engine.state_manager.states().keys()
+        else:
+            states = {name for step in self.steps for name in step.state_names}
+        for state in states:
+            sfx_names.update((f'{state}_on', f'{state}_off'))
+
+        sfx_names.update(self.engine.get_option('engine_sounds') or [])
+        sfx_names.update(self.engine.get_option('critical_sounds') or [])
+        return sfx_names, music_names
+
     def get_scenario(self) -> str:
         """
         Get the  name of the current scenario
@@ -570,6 +598,10 @@ class Scenario(EventObject):
     def on_stop_sound(self, name=None):
         self.engine.sound_manager.stop(name)
 
+    @event('ambient_sounds')
+    def on_ambient_sounds(self, density=None, seed=None):
+        self.engine.sound_manager.schedule_ambient(density=density, seed=seed)
+
     @event('reset_buttons')
     def on_reset_buttons(self):
         self.engine.reset_hardware()
@@ -589,6 +621,28 @@ class Scenario(EventObject):
     def on_led_off(self, led):
         self.engine.state_manager.get_state(led).set_led_off()
 
+    @event('led_animation')
+    def on_led_animation(self, leds, pattern='blink', period=None, name=None):
+        # leds are given as a comma separated list of states
+        led_ids = []
+        for led in str(leds).split(','):
+            try:
+                led_id = self.engine.state_manager.get_state(led.strip()).led_id
+            except AttributeError:
+                led_id = None
+            if led_id is None:
+                Logger.error(f'cannot animate "{led.strip()}": unknown state or state without led')
+            else:
+                led_ids.append(led_id)
+        if len(led_ids) == 0:
+            return
+        self.engine.hardware.animate_leds(name if name is not None else str(leds), led_ids,
+                                          pattern=pattern, period=period)
+
+    @event('stop_led_animation')
+    def on_stop_led_animation(self, leds=None, name=None, value=False):
+        self.engine.hardware.stop_led_animation(name if name is not None else str(leds), value=value)
+
     # def remove_incoming_events(self) -> None:
     #     """
     #     Remove all incoming events, ignoring steps
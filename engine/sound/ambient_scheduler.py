@@ -0,0 +1,94 @@
+import random
+from typing import Callable, Iterable, List, Optional, Tuple
+
+
+def poisson_schedule(names: Iterable[str], density: float, duration: float,
+                     rng: random.Random) -> List[Tuple[float, str]]:
+    """
+    Draw the times when each sound is played, as independent Poisson processes
+
+    Args:
+        names: the sound names
+        density (float): mean number of times each sound is played per minute
+        duration (float): duration of the schedule, in seconds
+        rng (random.Random): the random generator
+
+    Returns:
+        a sorted list of times (in seconds) and sound names
+    """
+    schedule = []
+    if density <= 0.0:
+        return schedule
+    rate = density / 60.0
+    for name in names:
+        t = rng.expovariate(rate)
+        while t < duration:
+            schedule.append((t, name))
+            t += rng.expovariate(rate)
+    schedule.sort()
+    return schedule
+
+
+class AmbientScheduler:
+    """
+    Plays ambient sounds at random times from a precomputed schedule, with a single task sleeping until the next
+    sound is due.
+    """
+    def __init__(self, task_mgr, play: Callable[[str], None]):
+        """
+        Args:
+            task_mgr: the panda3d task manager
+            play (callable): function called with the name of the ambient sound to play
+        """
+        self._task_mgr = task_mgr
+        self._play = play
+        self._schedule: List[Tuple[float, str]] = []
+        self._next = 0
+        self._time = 0.0
+        self._task = None
+
+    @property
+    def schedule(self) -> List[Tuple[float, str]]:
+        """
+        The current schedule, as a sorted list of times (in seconds from its start) and sound names
+        """
+        return self._schedule
+
+    def start(self, names: Iterable[str], density: float, duration: float, seed: Optional[int] = None) -> None:
+        """
+        Draw a new schedule and start it, replacing the current one
+
+        Args:
+            names: the ambient sound names
+            density (float): mean number of times each sound is played per minute
+            duration (float): duration of the schedule, in seconds
+            seed (:obj:`int`, optional): seed of the random generator, for reproducible schedules
+        """
+        self.cancel()
+        self._schedule = poisson_schedule(sorted(names), density, duration, random.Random(seed))
+        self._next = 0
+        self._time = 0.0
+        if len(self._schedule) > 0:
+            self._task = self._task_mgr.doMethodLater(self._schedule[0][0], self._on_time, name='ambient')
+
+    def cancel(self) -> None:
+        """
+        Cancel all incoming sounds
+        """
+        if self._task is not None:
+            self._task_mgr.remove(self._task)
+            self._task = None
+
+    def _on_time(self, task):
+        self._time = self._schedule[self._next][0]
+        # play all sounds due at this time
+        while self._next < len(self._schedule) and self._schedule[self._next][0] <= self._time:
+            self._play(self._schedule[self._next][1])
+            self._next += 1
+
+        if self._next < len(self._schedule):
+            # sleep until the next sound
+            task.delayTime = self._schedule[self._next][0] - self._time
+            return task.again
+        self._task = None
+        return task.done
@@ -0,0 +1,155 @@
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class MixerVoice:
+    """
+    A sfx played by the mixer
+    """
+    __slots__ = ('name', 'sound', 'priority', 'start_time')
+
+    def __init__(self, name: str, sound, priority: int):
+        self.name = name
+        self.sound = sound
+        self.priority = priority
+        self.start_time = time.monotonic()
+
+
+class Mixer:
+    """
+    Global control of played sounds. The number of sfx playing at once is limited: when the limit is reached, a new
+    sfx stops the oldest sfx of lower or equal priority, or is not played if there is none. Music and ambient sounds
+    are ducked while a voice plays. Volume changes of playing sounds are applied once per frame, by a single task.
+    """
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+    def __init__(self, task_mgr, max_voices: int = 8, duck_level: float = 0.4, duck_time: float = 0.3,
+                 is_voice_playing: Optional[Callable[[], bool]] = None):
+        """
+        Args:
+            task_mgr: the panda3d task manager
+            max_voices (int): maximum number of sfx playing at once
+            duck_level (float): gain of music and ambient sounds while a voice plays
+            duck_time (float): duration of the gain transition, in seconds
+            is_voice_playing (:obj:`callable`, optional): function telling if a voice is playing
+        """
+        self._max_voices = max_voices
+        self._duck_level = duck_level
+        self._duck_speed = (1.0 - duck_level) / duck_time if duck_time > 0 else float('inf')
+        self._is_voice_playing = is_voice_playing if is_voice_playing is not None else lambda: False
+
+        self._voices: List[MixerVoice] = []
+        # background sounds (music and ambient) and their volume before ducking
+        self._background: Dict[object, float] = dict()
+        self._gain = 1.0
+        # volume changes to apply on next frame
+        self._pending: Dict[object, float] = dict()
+        self._last_update = time.monotonic()
+
+        self.stolen = 0
+        self.rejected = 0
+        task_mgr.add(self._update, 'audio_mixer', sort=45)
+
+    @property
+    def playing(self) -> List[str]:
+        """
+        Names of the sfx playing
+        """
+        self._prune()
+        return [voice.name for voice in self._voices]
+
+    def play(self, name: str, sound, priority: int = NORMAL) -> bool:
+        """
+        Play a sfx if the voice limit allows it
+
+        Args:
+            name (str): the sfx name
+            sound: the sound
+            priority (int): one of :attr:`HIGH`, :attr:`NORMAL` or :attr:`LOW`
+
+        Returns:
+            ``True`` if the sfx is played
+        """
+        self._prune()
+        if len(self._voices) >= self._max_voices:
+            candidates = [voice for voice in self._voices if voice.priority >= priority]
+            if len(candidates) == 0:
+                self.rejected += 1
+                return False
+            # steal the least important, then oldest, voice
+            stolen = max(candidates, key=lambda v: (v.priority, -v.start_time))
+            stolen.sound.stop()
+            self._voices.remove(stolen)
+            self.stolen += 1
+
+        self._voices = [voice for voice in self._voices if voice.sound is not sound]
+        self._voices.append(MixerVoice(name, sound, priority))
+        sound.play()
+        return True
+
+    def stop(self, name: str) -> None:
+        """
+        Stop a sfx played by the mixer
+        """
+        for voice in [v for v in self._voices if v.name == name]:
+            voice.sound.stop()
+            self._voices.remove(voice)
+
+    def stop_all(self) -> None:
+        """
+        Stop all sfx played by the mixer
+        """
+        for voice in self._voices:
+            voice.sound.stop()
+        self._voices.clear()
+
+    def set_volume(self, sound, volume: float) -> None:
+        """
+        Change the volume of a sound on next frame
+        """
+        if sound in self._background:
+            self._background[sound] = volume
+            volume *= self._gain
+        self._pending[sound] = volume
+
+    def play_background(self, sound, volume: float) -> None:
+        """
+        Play a music or an ambient sound, ducked while voices play
+
+        Args:
+            sound: the sound
+            volume (float): its volume without ducking
+        """
+        self._background[sound] = volume
+        self._pending.pop(sound, None)
+        sound.set_volume(volume * self._gain)
+        sound.play()
+
+    def remove_background(self, sound) -> None:
+        """
+        Forget a music or an ambient sound, e.g. once released
+        """
+        self._background.pop(sound, None)
+        self._pending.pop(sound, None)
+
+    def _prune(self) -> None:
+        self._voices = [voice for voice in self._voices if voice.sound.status() == voice.sound.PLAYING]
+
+    def _update(self, task):
+        t = time.monotonic()
+        dt = t - self._last_update
+        self._last_update = t
+
+        target = self._duck_level if self._is_voice_playing() else 1.0
+        if self._gain != target:
+            step = self._duck_speed * dt
+            self._gain = min(target, self._gain + step) if self._gain < target else max(target, self._gain - step)
+            for sound, volume in self._background.items():
+                self._pending[sound] = volume * self._gain
+
+        for sound, volume in self._pending.items():
+            sound.set_volume(volume)
+        self._pending.clear()
+        return task.cont
@@ -0,0 +1,81 @@
+import random
+import re
+from typing import Dict, List, Optional
+
+
+class MusicIndex:
+    """
+    Groups music files by base name: a music named ``name`` can be played from a file ``name`` or from one of its
+    variants ``name_<x>`` where ``<x>`` is a number. Variants are picked from a shuffle bag, so that all variants are
+    played before one is played again, and never twice in a row.
+    """
+    _variant_regex = re.compile(r'(.+)_[0-9]+$')
+
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Args:
+            seed (:obj:`int`, optional): seed of the random generator
+        """
+        self._files: Dict[str, str] = dict()
+        self._variants: Dict[str, List[str]] = dict()
+        self._bags: Dict[str, List[str]] = dict()
+        self._last: Dict[str, str] = dict()
+        self._rng = random.Random(seed)
+
+    def add(self, name: str, path: str) -> None:
+        """
+        Add a music file
+
+        Args:
+            name (str): the music name, i.e. the file name without extension
+            path (str): the file
+        """
+        self._files[name] = path
+        match = self._variant_regex.match(name)
+        if match is not None:
+            self._variants.setdefault(match.group(1), []).append(name)
+            self._bags.pop(match.group(1), None)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._files
+
+    def path(self, name: str) -> Optional[str]:
+        """
+        Get the file of a music
+        """
+        return self._files.get(name, None)
+
+    def variants(self, name: str) -> List[str]:
+        """
+        Get the music files matching a name, either the name itself or its variants
+        """
+        if name in self._files:
+            return [name]
+        return self._variants.get(name, [])
+
+    def pick(self, name: str) -> Optional[str]:
+        """
+        Pick the music file to play for a name
+
+        Args:
+            name (str): the music name
+
+        Returns:
+            the name itself if it is a music file, else one of its variants, or ``None`` if there is none
+        """
+        if name in self._files:
+            return name
+        variants = self._variants.get(name, None)
+        if not variants:
+            return None
+
+        bag = self._bags.get(name, None)
+        if not bag:
+            bag = list(variants)
+            self._rng.shuffle(bag)
+            # avoid playing the same variant twice in a row when refilling the bag
+            if len(bag) > 1 and bag[-1] == self._last.get(name, None):
+                bag[0], bag[-1] = bag[-1], bag[0]
+            self._bags[name] = bag
+        self._last[name] = bag.pop()
+        return self._last[name]
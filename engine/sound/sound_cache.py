@@ -0,0 +1,194 @@
+import os
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from panda3d.core import AudioManager
+
+from engine.utils.logger import Logger
+
+
+class SoundCache:
+    """
+    Loads sounds on demand and keeps them in memory within a size budget. When the budget is exceeded, the least
+    recently used sounds are released, except pinned or playing ones. Streamed sounds are not decoded in memory, they
+    are opened instantly and do not count in the budget.
+    """
+    def __init__(self, loader, budget: int, manager=None):
+        """
+        Args:
+            loader: the panda3d loader
+            budget (int): maximum size of loaded sounds, in bytes
+            manager (:obj:`AudioManager`, optional): the audio manager used to open streamed sounds
+        """
+        self._loader = loader
+        self._budget = budget
+        self._manager = manager
+        # name -> file path and size of available sounds
+        self._files: Dict[str, str] = dict()
+        self._sizes: Dict[str, int] = dict()
+        # loaded sounds, from least to most recently used
+        self._sounds: OrderedDict = OrderedDict()
+        self._size = 0
+        self._pinned: Set[str] = set()
+        self._streamed: Set[str] = set()
+        # callbacks waiting for an asynchronous load
+        self._pending: Dict[str, List[Callable]] = dict()
+
+    def register(self, name: str, path: str, size: Optional[int] = None, stream: bool = False) -> None:
+        """
+        Declare an available sound, without loading it
+
+        Args:
+            name (str): the sound name
+            path (str): its file
+            size (:obj:`int`, optional): its size in memory, in bytes. Default is the file size
+            stream (bool): stream the sound from its file instead of decoding it in memory
+        """
+        self._files[name] = path
+        if stream and self._manager is not None:
+            self._streamed.add(name)
+            self._sizes[name] = 0
+        else:
+            self._streamed.discard(name)
+            self._sizes[name] = size if size is not None else os.path.getsize(path)
+
+    def is_streamed(self, name: str) -> bool:
+        """
+        Check if a sound is streamed
+        """
+        return name in self._streamed
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._files
+
+    def names(self) -> List[str]:
+        """
+        Names of all available sounds
+        """
+        return list(self._files.keys())
+
+    def loaded(self) -> Iterable:
+        """
+        All sounds currently in memory
+        """
+        return list(self._sounds.values())
+
+    @property
+    def size(self) -> int:
+        """
+        Size of the loaded sounds, in bytes
+        """
+        return self._size
+
+    def get(self, name: str):
+        """
+        Get a sound if it is loaded
+
+        Args:
+            name (str): the sound name
+
+        Returns:
+            the sound or ``None`` if not loaded
+        """
+        sound = self._sounds.get(name, None)
+        if sound is not None:
+            self._sounds.move_to_end(name)
+        return sound
+
+    def load(self, name: str):
+        """
+        Get a sound, loading it if needed. This blocks until the sound is loaded
+
+        Args:
+            name (str): the sound name
+
+        Returns:
+            the sound or ``None`` if it does not exist
+        """
+        sound = self.get(name)
+        if sound is None and name in self._files:
+            if name in self._streamed:
+                sound = self._manager.get_sound(self._files[name], False, AudioManager.SM_stream)
+            else:
+                sound = self._loader.loadSfx(self._files[name])
+            self._add(name, sound)
+        return sound
+
+    def load_async(self, name: str, callback: Optional[Callable] = None) -> None:
+        """
+        Load a sound in background and call `callback` with the sound once loaded
+
+        Args:
+            name (str): the sound name
+            callback (:obj:`callable`, optional): function called with the loaded sound
+        """
+        sound = self.get(name)
+        if sound is None and name in self._streamed:
+            # opening a stream does not decode anything
+            sound = self.load(name)
+        if sound is not None:
+            if callback is not None:
+                callback(sound)
+            return
+        if name not in self._files:
+            return
+
+        already_loading = name in self._pending
+        self._pending.setdefault(name, [])
+        if callback is not None:
+            self._pending[name].append(callback)
+        if not already_loading:
+            self._loader.loadSfx(self._files[name], callback=self._on_loaded, extraArgs=[name])
+
+    def _on_loaded(self, sound, name: str) -> None:
+        self._add(name, sound)
+        for callback in self._pending.pop(name, []):
+            callback(sound)
+
+    def pin(self, names: Iterable[str]) -> None:
+        """
+        Keep some sounds in memory. They will be loaded on their first use and never released
+
+        Args:
+            names: the sound names
+        """
+        self._pinned.update(name for name in names if name in self._files)
+
+    def unpin_all(self) -> None:
+        """
+        Remove all pinned sounds
+        """
+        self._pinned.clear()
+
+    def release_unpinned(self) -> None:
+        """
+        Release all loaded sounds that are neither pinned nor playing
+        """
+        for name in list(self._sounds.keys()):
+            sound = self._sounds[name]
+            if name not in self._pinned and sound.status() != sound.PLAYING:
+                self._release(name)
+
+    def _add(self, name: str, sound) -> None:
+        if name not in self._sounds:
+            self._size += self._sizes[name]
+        self._sounds[name] = sound
+        self._sounds.move_to_end(name)
+        self._evict()
+
+    def _evict(self) -> None:
+        """
+        Release least recently used sounds until the budget is respected
+        """
+        for name in list(self._sounds.keys()):
+            if self._size <= self._budget:
+                break
+            sound = self._sounds[name]
+            if name in self._pinned or sound.status() == sound.PLAYING:
+                continue
+            self._release(name)
+
+    def _release(self, name: str) -> None:
+        Logger.info(f'releasing sound "{name}"')
+        self._sounds.pop(name)
+        self._size -= self._sizes[name]
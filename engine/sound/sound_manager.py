@@ -1,8 +1,16 @@
-import re
+import time
 from os import listdir
-import numpy as np
-from direct.showbase.DirectObject import DirectObject
+from typing import Dict
 
+from direct.showbase.DirectObject import DirectObject
+from panda3d.core import AudioManager
+
+from engine.sound.ambient_scheduler import AmbientScheduler
+from engine.sound.mixer import Mixer
+from engine.sound.music_index import MusicIndex
+from engine.sound.sound_cache import SoundCache
+from engine.sound.sound_manifest import SoundManifest
+from engine.sound.voice_scheduler import VoiceScheduler
 from engine.utils.logger import Logger
 from engine.utils.ini_parser import read_file_as_list
 
@@ -11,41 +19,56 @@ class SoundManager(DirectObject):
     """
     Sound management class
     """
+    # priorities of the mixer for sfx that are not queued
+    _mixer_priorities = {VoiceScheduler.CRITICAL: Mixer.HIGH,
+                         VoiceScheduler.NORMAL: Mixer.NORMAL,
+                         VoiceScheduler.HINT: Mixer.LOW}
+
     def __init__(self, engine, load=True):
         super().__init__()
-        self._sounds = dict()
+        self._engine = engine
+        # sfx are loaded on demand, long ones are streamed
+        self._sounds = SoundCache(self._engine.loader, budget=int(self._engine.get_option('sfx_cache_size') * 2 ** 20),
+                                  manager=self._engine.sfxManagerList[0])
         self._ambient_sounds = dict()
+        # music files, loaded on demand
+        self._music_index = MusicIndex()
         self._music = dict()
-        self._engine = engine
+        self._music_loading = set()
+        # incremented each time sounds are stopped, so that sounds loading
+        # in background are not played after that
+        self._generation = 0
         # only wav files supported
         self._supported_sound_format = ('wav', )
+        # durations and formats of sfx, read from headers even when sound is disabled
+        self._manifest = SoundManifest(self._engine.get_option('sound_manifest_file'))
+        self._sfx_infos = self._manifest.scan(self._engine.get_option('sfx_sound_folder'), self._supported_sound_format)
+        self._manifest.save()
 
         self._ambient_volume = 1.0
         self._ambient_loop = None
         self._bips = None
-        self._ambient_tasks = []
+        self._ambient_scheduler = AmbientScheduler(self._engine.taskMgr, self._play_ambient)
         self._last_sfx_played = None
         self._last_music_played = None
 
         # list of sounds that should not be stopped or overridden
-        self._protected_sounds = read_file_as_list(self._engine.get_option("non_overlapping_sounds"))
-        self._queue = []
-        self._is_playing = False
+        self._protected_sounds = set(read_file_as_list(self._engine.get_option("non_overlapping_sounds")))
+        # sounds that interrupt other protected sounds
+        self._critical_sounds = set(self._engine.get_option("critical_sounds") or [])
+        self._voices = VoiceScheduler(self._engine.taskMgr, hint_max_delay=self._engine.get_option("hint_max_delay"))
+        # limits played sfx and ducks music and ambient sounds while voices play
+        self._mixer = Mixer(self._engine.taskMgr,
+                            max_voices=self._engine.get_option("max_sfx_voices"),
+                            duck_level=self._engine.get_option("duck_level"),
+                            duck_time=self._engine.get_option("duck_time"),
+                            is_voice_playing=lambda: self._voices.is_playing)
+        # memory and first play latency of streamed and decoded sounds
+        self._stream_stats = {kind: {'files': 0, 'size': 0, 'first_play': []} for kind in ('streamed', 'decoded')}
+        self._played_once = set()
         if load:
             self.load_sounds()
 
-    def _start_next(self, t=None):
-        """
-        Start the next sound in chain
-        """
-        self._is_playing = False
-        if len(self._queue) > 0:
-            last = self._queue.pop(0)
-            self._is_playing = True
-            last.play()
-
-            self._engine.taskMgr.doMethodLater(last.length() + 0.2, self._start_next, name="sfx_overlap")
-
     @staticmethod
     def _get_file_name(name: str) -> str:
         """
@@ -55,24 +78,30 @@ class SoundManager(DirectObject):
 
     def load_sounds(self):
         """
-        Load all sounds
+        Index all sounds. Sfx and music are loaded on demand, except the sfx of the warm-up list
         """
-        Logger.info('loading sfx')
-        folder = self._engine.get_option("sfx_sound_folder")
-        files = listdir(folder)
-        np.random.shuffle(files)
-        for file in files:
-            key = self._get_file_name(file)
-            if file.endswith(self._supported_sound_format) and 'old' not in file:
-                self._sounds[key] = self._engine.loader.loadSfx(folder + file)
+        Logger.info('indexing sfx')
+        for key, info in self._sfx_infos.items():
+            if 'old' not in key:
+                stream = self._should_stream(info)
+                self._sounds.register(key, info.path, size=info.decoded_size, stream=stream)
+                self._count_sound(info, stream)
+
+        self.warm_up(self._engine.get_option('sfx_warm_up'))
 
         Logger.info('loading ambient musics')
-        ambient_folder = self._engine.get_option("ambient_sound_folder")
-        for file in listdir(ambient_folder):
-            key = self._get_file_name(file)
-            if file.endswith(self._supported_sound_format):
-                Logger.info(f'loading ambient sound : {key}')
-                self._ambient_sounds[key] = self._engine.loader.loadSfx(ambient_folder + file)
+        ambient_infos = self._manifest.scan(self._engine.get_option("ambient_sound_folder"),
+                                            self._supported_sound_format)
+        self._manifest.save()
+        for key, info in ambient_infos.items():
+            stream = self._should_stream(info)
+            Logger.info(f'loading ambient sound : {key}{" (streamed)" if stream else ""}')
+            if stream:
+                self._ambient_sounds[key] = self._engine.sfxManagerList[0].get_sound(info.path, False,
+                                                                                     AudioManager.SM_stream)
+            else:
+                self._ambient_sounds[key] = self._engine.loader.loadSfx(info.path)
+            self._count_sound(info, stream)
 
         # getting the loop ambient sound
         ambient_loop_file = self._get_file_name(self._engine.get_option("ambient_loop_file"))
@@ -86,28 +115,101 @@ class SoundManager(DirectObject):
         else:
             Logger.warning('no bips file !')
 
-        Logger.info('loading music files')
+        Logger.info('indexing music files')
         music_folder = self._engine.get_option("music_sound_folder")
         for file in listdir(music_folder):
             key = self._get_file_name(file)
             if file.endswith(self._supported_sound_format):
-                Logger.info(f'loading music sound : {key}')
-                self._music[key] = self._engine.loader.loadMusic(music_folder + file)
+                self._music_index.add(key, music_folder + file)
 
-    def reset(self, n=5, t_max=900) -> None:
+    def _should_stream(self, info) -> bool:
+        """
+        Check if a sound is long enough to be streamed instead of decoded in memory
         """
-        Reset all sounds.
+        return info.duration >= self._engine.get_option('stream_min_duration') or \
+            info.decoded_size >= self._engine.get_option('stream_min_size') * 2 ** 20
+
+    def _count_sound(self, info, stream: bool) -> None:
+        stats = self._stream_stats['streamed' if stream else 'decoded']
+        stats['files'] += 1
+        stats['size'] += info.decoded_size
+
+    @property
+    def stream_statistics(self) -> Dict[str, Dict]:
+        """
+        For streamed and decoded sounds, the number of files, their decoded size (in bytes, i.e. the memory saved for
+        streamed sounds) and the latencies (in seconds) between the first request to play a sfx and its playing
+        """
+        return self._stream_stats
+
+    def warm_up(self, names) -> None:
+        """
+        Load some sfx in background
 
         Args:
-            n:
-            t_max:
+            names (str or list[str]): the names of the sfx
+        """
+        if isinstance(names, str):
+            names = [names]
+        for name in names or []:
+            self._sounds.load_async(name)
+
+    def preload(self, sfx_names, music_names=()) -> None:
+        """
+        Keep in memory the sounds a scenario can play and load them in background, e.g. while the menu is shown. Other
+        sounds are released, except the ones of the warm-up list and the ones currently playing.
+
+        Args:
+            sfx_names (list[str]): the names of the sfx
+            music_names (list[str]): the names of the musics, possibly with variants
+        """
+        warm_up = self._engine.get_option('sfx_warm_up') or []
+        sfx_names = set(sfx_names) | ({warm_up} if isinstance(warm_up, str) else set(warm_up))
+        sfx_names = [name for name in sfx_names if name in self._sounds]
+        self._sounds.unpin_all()
+        self._sounds.pin(sfx_names)
+        self._sounds.release_unpinned()
+
+        music_names = {variant for name in music_names for variant in self._music_index.variants(name)}
+        for name in list(self._music.keys()):
+            music = self._music[name]
+            if name not in music_names and music.status() != music.PLAYING:
+                Logger.info(f'releasing music "{name}"')
+                self._mixer.remove_background(self._music.pop(name))
+
+        Logger.info(f'preloading {len(sfx_names)} sfx and {len(music_names)} musics')
+        self.warm_up(sfx_names)
+        for name in music_names:
+            self._load_music_async(name)
+
+    def _get_music(self, name: str):
         """
-        for _ in range(len(self._ambient_tasks)):
-            self._engine.taskMgr.remove(self._ambient_tasks.pop())
+        Get a music, loading it if needed
+        """
+        if name not in self._music and name in self._music_index:
+            Logger.info(f'loading music sound : {name}')
+            self._music[name] = self._engine.loader.loadMusic(self._music_index.path(name))
+        return self._music.get(name, None)
 
+    def _load_music_async(self, name: str) -> None:
+        """
+        Load a music in background
+        """
+        if name not in self._music and name not in self._music_loading and name in self._music_index:
+            self._music_loading.add(name)
+            self._engine.loader.loadMusic(self._music_index.path(name), callback=self._on_music_loaded,
+                                          extraArgs=[name])
+
+    def _on_music_loaded(self, music, name: str) -> None:
+        self._music_loading.discard(name)
+        self._music.setdefault(name, music)
+
+    def reset(self) -> None:
+        """
+        Reset all sounds, and draw new times for ambient sounds
+        """
         # stop current playing sounds
-        for sound in self._sounds.values():
-            sound.stop()
+        self.stop_sfx()
 
         # stop bips
         self.stop_bips()
@@ -118,45 +220,58 @@ class SoundManager(DirectObject):
         # ignore all events
         self.ignore_all()
 
-        self._queue = []
-        self._is_playing = False
-
-        # random times
-        # for ambient sounds
-        for name in self._ambient_sounds:
-            t = t_max * np.random.rand(n)
-            for i in t:
-                self._ambient_tasks.append(self._engine.taskMgr.doMethodLater(
-                    i,
-                    self._play_ambient,
-                    name="ambient",
-                    extraArgs=[name])
-                )
+        # random times for ambient sounds
+        self.schedule_ambient()
+
+        if self._mixer.stolen > 0 or self._mixer.rejected > 0:
+            Logger.info(f'voice limit reached: {self._mixer.stolen} sfx stopped, {self._mixer.rejected} sfx not played')
+        self._mixer.stolen = 0
+        self._mixer.rejected = 0
+
+        for kind, stats in self._stream_stats.items():
+            if len(stats['first_play']) > 0:
+                Logger.info(f'{kind} sounds: {stats["files"]} files, {stats["size"] / 2 ** 20:.1f} MB '
+                            f'{"saved" if kind == "streamed" else "when all loaded"}, first play latency '
+                            f'{1000 * sum(stats["first_play"]) / len(stats["first_play"]):.1f} ms '
+                            f'(max {1000 * max(stats["first_play"]):.1f} ms, {len(stats["first_play"])} sounds)')
+
+    def schedule_ambient(self, density: float = None, seed: int = None) -> None:
+        """
+        Draw the times when ambient sounds are played, from now on. Previous times are cancelled
+
+        Args:
+            density (:obj:`float`, optional): mean number of times each ambient sound is played per minute. Default is
+                the ``ambient_density`` option
+            seed (:obj:`int`, optional): seed of the random times. Default is the ``ambient_seed`` option
+        """
+        self._ambient_scheduler.start(
+            self._ambient_sounds.keys(),
+            density=float(density if density is not None else self._engine.get_option('ambient_density')),
+            duration=self._engine.get_option('ambient_duration'),
+            seed=seed if seed is not None else self._engine.get_option('ambient_seed')
+        )
 
     def set_ambient_volume(self, volume):
         self._ambient_volume = volume
         if self._ambient_loop is not None and self._ambient_loop.status() == self._ambient_loop.PLAYING:
-            self._ambient_loop.setVolume(self._ambient_volume)
+            self._mixer.set_volume(self._ambient_loop, self._ambient_volume)
         if self._bips is not None:
-            self._bips.setVolume(0.5 * self._ambient_volume)
+            self._mixer.set_volume(self._bips, 0.5 * self._ambient_volume)
 
     def _play_ambient(self, name):
         if name in self._ambient_sounds:
-            self._ambient_sounds[name].setVolume(self._engine.get_option("volume_ambient"))
-            self._ambient_sounds[name].play()
+            self._mixer.play_background(self._ambient_sounds[name], self._engine.get_option("volume_ambient"))
 
     def play_ambient_sound(self):
         if self._ambient_loop is not None:
             self._ambient_loop.setLoop(True)
-            self._ambient_loop.setVolume(self._engine.get_option("volume_ambient"))
-            self._ambient_loop.play()
+            self._mixer.play_background(self._ambient_loop, self._engine.get_option("volume_ambient"))
         self.play_bips()
 
     def play_bips(self):
         if self._bips is not None:
             self._bips.setLoop(True)
-            self._bips.setVolume(0.5)
-            self._bips.play()
+            self._mixer.play_background(self._bips, 0.5)
 
     def stop_bips(self):
         if self._bips is not None:
@@ -166,11 +281,17 @@ class SoundManager(DirectObject):
         if self._ambient_loop is not None and self._ambient_loop.status() == self._ambient_loop.PLAYING:
             self._ambient_loop.stop()
 
-    def get_sound_length(self, name):
-        if name in self._sounds:
-            return self._sounds[name].length()
-        else:
-            return 0.0
+    def get_sound_length(self, name: str) -> float:
+        """
+        Get the duration of a sfx from the manifest, without loading it
+
+        Args:
+            name (str): the sfx name
+
+        Returns:
+            the duration in seconds, or 0.0 if the sfx does not exist
+        """
+        return self._manifest.duration(name)
 
     @property
     def is_music_playing(self) -> bool:
@@ -212,21 +333,15 @@ class SoundManager(DirectObject):
         # remember the name if overriden
         # below
         raw_name = name
-        if name not in self._music:
-            # if name is not in self._music
-            # we check if there is a music matching
-            # "name_<x>" where "<x>" is a digit.
-            # If it is the case, we pick one random item
-            # in the list.
-            regex = re.compile(f"{name}_[0-9]+")
-            matches = [k for k in self._music if re.match(regex, k)]
-            if len(matches) > 0:
-                # pick a random one
-                name = np.random.choice(matches)
-                Logger.info(f'picking a random music "{name}" from name "{raw_name}"')
-
-        if name in self._music:
-            music = self._music[name]
+        # if there is no music with this name, we pick
+        # one of the musics matching "name_<x>" where
+        # "<x>" is a digit, if there are some.
+        name = self._music_index.pick(raw_name) or raw_name
+        if name != raw_name:
+            Logger.info(f'picking a random music "{name}" from name "{raw_name}"')
+
+        if name in self._music_index:
+            music = self._get_music(name)
 
             # if another music is played, stop it except if it is the same
             if self.is_music_playing:
@@ -246,54 +361,95 @@ class SoundManager(DirectObject):
                 # same file again and again
                 music.set_finished_event(raw_name)
                 self.accept_once(raw_name, lambda *args: self.play_music(raw_name, loop=True))
-            music.set_volume(self._engine.get_option('volume_music'))
-
             self._last_music_played = name
             Logger.info(f'playing new music "{name}"')
-            music.play()
+            self._mixer.play_background(music, self._engine.get_option('volume_music'))
         elif name is not None and name != 'None':
             Logger.error(f'no music named "{name}"')
 
-    def play_sfx(self, name, loop=False, volume=None, avoid_playing_twice=True):
-        if name in self._sounds:
-            # get sound file
-            sound = self._sounds[name]
+    def play_sfx(self, name, loop=False, volume=None, avoid_playing_twice=True, priority=None):
+        """
+        Play a sfx. Voices and protected sounds are queued and played one after another
 
-            # avoid playing the same sound many times
-            # except if avoid_playing_twice is False
-            if avoid_playing_twice and \
-                    ((len(self._queue) > 0 and name == self._queue[-1].get_name())
-                     or sound.status() == sound.PLAYING):
-                return
+        Args:
+            name (str): the sfx name
+            loop (bool): play the sfx in loop
+            volume (:obj:`float`, optional): the volume. Default depends on the kind of sfx
+            avoid_playing_twice (bool): do not play the sfx if it is already playing or queued
+            priority (:obj:`int`, optional): priority of the sfx, one of the :class:`VoiceScheduler` priorities,
+                mapped to the :class:`Mixer` ones for sfx that are not queued. Default is critical for critical
+                sounds, low for sounds of state changes and normal for others
+        """
+        if name in self._sounds:
+            if name not in self._played_once:
+                self._played_once.add(name)
+                t0 = time.perf_counter()
+                kind = 'streamed' if self._sounds.is_streamed(name) else 'decoded'
+                first_play = self._stream_stats[kind]['first_play']
+            else:
+                first_play = None
 
-            if loop:
-                # set loop
-                sound.setLoop(True)
-
-            # set volume
-            is_voice = 'voice' in name or 'human' in name
-            volume = volume if volume is not None \
-                else self._engine.get_option('volume_voice') if is_voice \
-                else self._engine.get_option('volume_sfx')
-            sound.setVolume(volume)
-
-            self._last_sfx_played = name
-            if name in self._protected_sounds or (self._engine.get_option("voice_sound_do_not_overlap") and
-                                                  ("voice" in name or "human" in name)):
-                # if playing sound is protected or either "voice" or "human" is in file name, we queue it
-                self._queue.append(sound)
-                if not self._is_playing:
-                    # no sound is playing right now, get next sound in queue
-                    self._start_next()
+            # get sound file
+            sound = self._sounds.get(name)
+            if sound is None:
+                # not loaded yet, it will be played once loaded
+                # except if sounds are stopped in the meantime
+                generation = self._generation
+
+                def _on_loaded(loaded_sound):
+                    if first_play is not None:
+                        first_play.append(time.perf_counter() - t0)
+                    if generation == self._generation:
+                        self._play_sfx(name, loaded_sound, loop, volume, avoid_playing_twice, priority)
+
+                self._sounds.load_async(name, _on_loaded)
             else:
-                # not protected, just play it
-                sound.play()
+                if first_play is not None:
+                    first_play.append(time.perf_counter() - t0)
+                self._play_sfx(name, sound, loop, volume, avoid_playing_twice, priority)
         elif name == "bips":
             # it bips, just play it
             self.play_bips()
         elif name is not None and name != 'None':
             Logger.warning(f'sound "{name}" does not exists')
 
+    def _play_sfx(self, name, sound, loop, volume, avoid_playing_twice, priority):
+        """
+        Play a loaded sfx
+        """
+        # avoid playing the same sound many times
+        # except if avoid_playing_twice is False
+        if avoid_playing_twice and sound.status() == sound.PLAYING:
+            return
+
+        if loop:
+            # set loop
+            sound.setLoop(True)
+
+        # set volume
+        is_voice = 'voice' in name or 'human' in name
+        volume = volume if volume is not None \
+            else self._engine.get_option('volume_voice') if is_voice \
+            else self._engine.get_option('volume_sfx')
+        sound.setVolume(volume)
+
+        self._last_sfx_played = name
+        if name in self._protected_sounds or name in self._critical_sounds or \
+                (self._engine.get_option("voice_sound_do_not_overlap") and is_voice):
+            # if playing sound is protected or either "voice" or "human" is in file name, we queue it
+            if priority is None:
+                priority = VoiceScheduler.CRITICAL if name in self._critical_sounds else VoiceScheduler.NORMAL
+            self._voices.push(name, sound, priority=priority, unique=avoid_playing_twice)
+        else:
+            # not protected, play it if the mixer allows it,
+            # sounds of state changes being the least important
+            # and loops the most important
+            if priority is None:
+                mixer_priority = Mixer.HIGH if loop else Mixer.LOW if name.endswith(('_on', '_off')) else Mixer.NORMAL
+            else:
+                mixer_priority = self._mixer_priorities[priority]
+            self._mixer.play(name, sound, priority=mixer_priority)
+
     def stop_sfx(self, clear_queue: bool = True) -> None:
         """
         Stop current sfx and optionally clear playing queue
@@ -301,13 +457,13 @@ class SoundManager(DirectObject):
         Args:
             clear_queue (bool): clear incoming sounds
         """
-        for sfx in self._sounds.values():
-            sfx.stop()
-        self._is_playing = False
+        self._generation += 1
+        self._mixer.stop_all()
 
         if clear_queue:
-            self._queue.clear()
-            self._engine.taskMgr.remove('sfx_overlap')
+            self._voices.clear()
+        else:
+            self._voices.stop_current()
 
     def stop(self, name: str) -> None:
         """
@@ -316,13 +472,13 @@ class SoundManager(DirectObject):
         Args:
             name (str): Sound name to stop
         """
-        if name in self._sounds:
-            sound = self._sounds[name]
-            if sound.status() == sound.PLAYING:
-                sound.stop()
+        self._mixer.stop(name)
+        sound = self._sounds.get(name)
+        if sound is not None and sound.status() == sound.PLAYING:
+            sound.stop()
 
     def __getitem__(self, item):
         """
         Get a sound file
         """
-        return self._sounds.get(item, None)
+        return self._sounds.get(item)
@@ -0,0 +1,193 @@
+import json
+import os
+import struct
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Tuple
+
+from engine.utils.logger import Logger
+
+
+@dataclass
+class SoundInfo:
+    """
+    Metadata of a sound file, read from its header
+    """
+    path: str
+    mtime: float
+    size: int
+    duration: float
+    sample_rate: int
+    channels: int
+    sample_width: int
+
+    @property
+    def decoded_size(self) -> int:
+        """
+        Size of the sound once decoded in memory (16 bits samples), in bytes
+        """
+        return int(self.duration * self.sample_rate * self.channels * 2)
+
+
+def read_wav_header(path: str) -> Tuple[float, int, int, int]:
+    """
+    Read the duration and format of a wav file from its header only, without decoding audio data
+
+    Args:
+        path (str): the wav file
+
+    Returns:
+        duration (in seconds), sample rate, number of channels and sample width (in bytes)
+    """
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as file:
+        riff, _, wave_id = struct.unpack('<4sI4s', file.read(12))
+        if riff != b'RIFF' or wave_id != b'WAVE':
+            raise ValueError(f'"{path}" is not a wav file')
+
+        fmt = None
+        data_size = None
+        while data_size is None:
+            header = file.read(8)
+            if len(header) < 8:
+                break
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+            if chunk_id == b'fmt ':
+                fmt = struct.unpack('<HHIIHH', file.read(16))
+                file.seek(chunk_size - 16 + (chunk_size & 1), 1)
+            elif chunk_id == b'data':
+                # size may be wrong for files written as streams
+                data_size = min(chunk_size, file_size - file.tell())
+            else:
+                # chunks are word aligned
+                file.seek(chunk_size + (chunk_size & 1), 1)
+
+    if fmt is None or data_size is None:
+        raise ValueError(f'"{path}" has no format or data chunk')
+    _, channels, sample_rate, byte_rate, _, bits = fmt
+    if byte_rate == 0:
+        raise ValueError(f'"{path}" has a null byte rate')
+    return data_size / byte_rate, sample_rate, channels, bits // 8
+
+
+class SoundManifest:
+    """
+    Durations and formats of sound files, read from wav headers and cached in a json file together with files
+    modification times, so that only new or modified files are read again
+    """
+    def __init__(self, file_name: Optional[str] = None):
+        """
+        Args:
+            file_name (:obj:`str`, optional): the json file used as cache
+        """
+        self._file_name = file_name
+        self._infos: Dict[str, SoundInfo] = dict()
+        self._by_name: Dict[str, SoundInfo] = dict()
+        self._modified = False
+
+        if file_name is not None and os.path.exists(file_name):
+            try:
+                with open(file_name, 'r') as file:
+                    self._infos = {path: SoundInfo(**info) for path, info in json.load(file).items()}
+            except (ValueError, TypeError) as e:
+                Logger.warning(f'cannot read sound manifest "{file_name}" ({e}), rebuilding it')
+
+    def scan(self, folder: str, extensions: Tuple[str, ...] = ('wav', )) -> Dict[str, SoundInfo]:
+        """
+        Get the metadata of all sounds in a folder, reading headers of new or modified files only
+
+        Args:
+            folder (str): the folder
+            extensions (tuple): supported extensions
+
+        Returns:
+            a :obj:`dict` from sound names (file names without extension) to :class:`SoundInfo`
+        """
+        sounds = dict()
+        if not os.path.isdir(folder):
+            Logger.warning(f'sound folder "{folder}" does not exist')
+            return sounds
+
+        for file in sorted(os.listdir(folder)):
+            if not file.endswith(extensions):
+                continue
+            path = os.path.join(folder, file)
+            stat = os.stat(path)
+            info = self._infos.get(path, None)
+            if info is None or info.mtime != stat.st_mtime or info.size != stat.st_size:
+                try:
+                    duration, sample_rate, channels, sample_width = read_wav_header(path)
+                except (ValueError, struct.error) as e:
+                    Logger.error(f'cannot read sound header of "{path}": {e}')
+                    continue
+                info = SoundInfo(path=path, mtime=stat.st_mtime, size=stat.st_size, duration=duration,
+                                 sample_rate=sample_rate, channels=channels, sample_width=sample_width)
+                self._infos[path] = info
+                self._modified = True
+            sounds[file.split('.')[0]] = info
+
+        for name, info in sounds.items():
+            self._add_name(name, info)
+        return sounds
+
+    def update(self, path: str) -> SoundInfo:
+        """
+        Read again the metadata of a single file, e.g. once it has been written
+
+        Args:
+            path (str): the file
+
+        Returns:
+            its :class:`SoundInfo`
+        """
+        stat = os.stat(path)
+        duration, sample_rate, channels, sample_width = read_wav_header(path)
+        info = SoundInfo(path=path, mtime=stat.st_mtime, size=stat.st_size, duration=duration,
+                         sample_rate=sample_rate, channels=channels, sample_width=sample_width)
+        self._infos[path] = info
+        self._add_name(os.path.basename(path).split('.')[0], info)
+        self._modified = True
+        return info
+
+    def _add_name(self, name: str, info: SoundInfo) -> None:
+        """
+        Index a sound by name. Sounds of the first scanned folder (sfx) are kept when names collide
+        """
+        current = self._by_name.get(name, None)
+        if current is not None and os.path.dirname(current.path) != os.path.dirname(info.path):
+            Logger.warning(f'sound "{info.path}" has the same name as "{current.path}", ignoring it')
+            return
+        self._by_name[name] = info
+
+    def get(self, name: str) -> Optional[SoundInfo]:
+        """
+        Get the metadata of a scanned sound
+
+        Args:
+            name (str): the sound name
+
+        Returns:
+            a :class:`SoundInfo` or ``None``
+        """
+        return self._by_name.get(name, None)
+
+    def duration(self, name: str) -> float:
+        """
+        Get the duration of a scanned sound
+
+        Args:
+            name (str): the sound name
+
+        Returns:
+            the duration in seconds, or 0.0 if the sound does not exist
+        """
+        info = self._by_name.get(name, None)
+        return info.duration if info is not None else 0.0
+
+    def save(self) -> None:
+        """
+        Write the manifest in its json file, if it changed
+        """
+        if self._file_name is not None and self._modified:
+            with open(self._file_name, 'w') as file:
+                json.dump({path: asdict(info) for path, info in self._infos.items()}, file, indent=1)
+            self._modified = False
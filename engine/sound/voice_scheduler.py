@@ -0,0 +1,138 @@
+import time
+from collections import deque
+from typing import Dict, Optional, Set
+
+from engine.utils.logger import Logger
+
+
+class QueuedVoice:
+    """
+    A sound waiting in the voice queue
+    """
+    __slots__ = ('name', 'sound', 'priority', 'time')
+
+    def __init__(self, name: str, sound, priority: int):
+        self.name = name
+        self.sound = sound
+        self.priority = priority
+        self.time = time.monotonic()
+
+
+class VoiceScheduler:
+    """
+    Plays voices and protected sounds one after another, by priority. A critical sound interrupts a less important
+    one, which is played again later, and hints that waited for too long are dropped. A single task, running only
+    while voices are playing or queued, starts the next voice once the current one is done.
+    """
+    CRITICAL = 0
+    NORMAL = 1
+    HINT = 2
+
+    def __init__(self, task_mgr, gap: float = 0.2, hint_max_delay: float = 5.0):
+        """
+        Args:
+            task_mgr: the panda3d task manager
+            gap (float): silence between two voices, in seconds
+            hint_max_delay (float): hints queued for longer than this delay, in seconds, are not played
+        """
+        self._task_mgr = task_mgr
+        self._gap = gap
+        self._hint_max_delay = hint_max_delay
+
+        self._queues: Dict[int, deque] = {p: deque() for p in (self.CRITICAL, self.NORMAL, self.HINT)}
+        self._queued: Set[str] = set()
+        self._current: Optional[QueuedVoice] = None
+        self._end_time = 0.0
+        self._task = None
+
+    @property
+    def current(self):
+        """
+        The voice being played, or ``None``
+        """
+        return self._current.sound if self._current is not None else None
+
+    @property
+    def is_playing(self) -> bool:
+        """
+        Check if a voice is being played
+        """
+        return self._current is not None and self._current.sound.status() == self._current.sound.PLAYING
+
+    def push(self, name: str, sound, priority: int = NORMAL, unique: bool = True) -> None:
+        """
+        Queue a voice
+
+        Args:
+            name (str): the sound name
+            sound: the sound
+            priority (int): one of :attr:`CRITICAL`, :attr:`NORMAL` or :attr:`HINT`
+            unique (bool): do not queue the sound if it is already queued or playing
+        """
+        # the current voice may be over, waiting for the gap before the next one
+        current = self._current if self.is_playing else None
+        if unique and (name in self._queued or (current is not None and current.name == name)):
+            return
+
+        voice = QueuedVoice(name, sound, priority)
+        if current is not None and priority < current.priority:
+            # preempt the current voice, it will be played again from its start
+            Logger.info(f'voice "{self._current.name}" interrupted by "{name}"')
+            self._current.sound.stop()
+            self._queues[self._current.priority].appendleft(self._current)
+            self._queued.add(self._current.name)
+            self._current = None
+            self._queues[priority].appendleft(voice)
+        else:
+            self._queues[priority].append(voice)
+        self._queued.add(name)
+
+        if self._task is None:
+            self._task = self._task_mgr.add(self._update, 'voice_scheduler')
+
+    def stop_current(self) -> None:
+        """
+        Stop the current voice. Queued voices are still played
+        """
+        if self._current is not None:
+            self._current.sound.stop()
+            self._current = None
+
+    def clear(self) -> None:
+        """
+        Stop the current voice and remove all queued voices
+        """
+        self.stop_current()
+        for queue in self._queues.values():
+            queue.clear()
+        self._queued.clear()
+        if self._task is not None:
+            self._task_mgr.remove(self._task)
+            self._task = None
+
+    def _pop(self) -> Optional[QueuedVoice]:
+        """
+        Get the next voice to play, by priority, dropping stale hints
+        """
+        for priority, queue in self._queues.items():
+            while len(queue) > 0:
+                voice = queue.popleft()
+                self._queued.discard(voice.name)
+                if priority == self.HINT and time.monotonic() - voice.time > self._hint_max_delay:
+                    Logger.info(f'dropping stale hint "{voice.name}"')
+                    continue
+                return voice
+        return None
+
+    def _update(self, task):
+        if self._current is not None and time.monotonic() < self._end_time:
+            return task.cont
+
+        self._current = self._pop()
+        if self._current is None:
+            self._task = None
+            return task.done
+
+        self._current.sound.play()
+        self._end_time = time.monotonic() + self._current.sound.length() + self._gap
+        return task.cont
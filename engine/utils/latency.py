@@ -0,0 +1,124 @@
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from engine.utils.logger import Logger
+
+
+class LatencyTrace:
+    """
+    A single hardware input going through the pipeline
+    """
+    __slots__ = ('name', 't0')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.t0 = time.perf_counter()
+
+
+class _LatencyTracker:
+    """
+    Measures the time between a hardware input and each stage of its processing: firewall, state update, led
+    writing, gui update and the frame where it becomes visible. Times are stored, in seconds from the input, in rolling
+    windows per stage.
+
+    Do not instantiate this class.
+    """
+    stages = ['firewall', 'set_value', 'led', 'gui', 'frame']
+    # histogram bins, in milliseconds
+    bins = [5, 10, 20, 50, 100, 200, 500]
+
+    def __init__(self, size: int = 500):
+        self.enabled = False
+        self.current: Optional[LatencyTrace] = None
+        self._samples: Dict[str, deque] = {stage: deque(maxlen=size) for stage in self.stages}
+        self._waiting_frame: List[LatencyTrace] = []
+
+    def enable(self, engine, size: int = 500) -> None:
+        """
+        Start measuring latencies
+
+        Args:
+            engine: the main engine
+            size (int): number of samples kept per stage
+        """
+        self.enabled = True
+        self._samples = {stage: deque(maxlen=size) for stage in self.stages}
+        # run after the frame is rendered ('igLoop' has sort 50)
+        engine.task_mgr.add(self._on_frame, 'latency_frame', sort=55)
+
+    def start(self, name: str) -> Optional[LatencyTrace]:
+        """
+        Start a trace for an input
+
+        Args:
+            name (str): name of the input
+
+        Returns:
+            a :class:`LatencyTrace` or ``None`` if disabled
+        """
+        return LatencyTrace(name) if self.enabled else None
+
+    def mark(self, trace: Optional[LatencyTrace], stage: str) -> None:
+        """
+        Record that a trace reached a stage. May be called from any thread
+
+        Args:
+            trace (LatencyTrace): the trace
+            stage (str): the stage
+        """
+        if trace is not None:
+            self._samples[stage].append(time.perf_counter() - trace.t0)
+            if stage == 'set_value':
+                self._waiting_frame.append(trace)
+
+    def mark_current(self, stage: str) -> None:
+        """
+        Record that the trace being processed reached a stage
+        """
+        if self.current is not None:
+            self.mark(self.current, stage)
+
+    def _on_frame(self, task):
+        for trace in self._waiting_frame:
+            self.mark(trace, 'frame')
+        self._waiting_frame.clear()
+        return task.cont
+
+    def report(self) -> str:
+        """
+        Build a text report with, for each stage, statistics and histogram of latencies in milliseconds
+
+        Returns:
+            a :obj:`str`
+        """
+        labels = [f'<{b}' for b in self.bins] + [f'>{self.bins[-1]}']
+        lines = [f'{"stage":<9} {"n":>3} {"p50":>5} {"p95":>5} {"max":>5} | '
+                 + ' '.join(f'{label:>5}' for label in labels)]
+        for stage in self.stages:
+            samples = sorted(1000 * s for s in list(self._samples[stage]))
+            n = len(samples)
+            if n == 0:
+                lines.append(f'{stage:<9} {0:>3}     -     -     - |')
+                continue
+            counts = [0] * (len(self.bins) + 1)
+            for s in samples:
+                counts[next((i for i, b in enumerate(self.bins) if s < b), len(self.bins))] += 1
+            lines.append(f'{stage:<9} {n:>3} {samples[n // 2]:>5.1f} {samples[int(0.95 * (n - 1))]:>5.1f} '
+                         f'{samples[-1]:>5.1f} | ' + ' '.join(f'{c:>5}' for c in counts))
+        return '\n'.join(lines)
+
+    def dump(self, file_name: str) -> None:
+        """
+        Append the current report to a file
+
+        Args:
+            file_name (str): the file
+        """
+        with open(file_name, 'a+') as file:
+            file.write(f'--- {time.strftime("%Y-%m-%d %H:%M:%S")} (ms from input)\n{self.report()}\n')
+        Logger.info(f'latency report written in {file_name}')
+
+
+latency_tracker = _LatencyTracker()
+"""The latency tracker"""
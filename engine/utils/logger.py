@@ -1,23 +1,70 @@
+import atexit
 import logging
-from direct.showbase.MessengerGlobal import messenger
-
+import queue
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener
 
-logging.basicConfig(
-    format='%(levelname)s [%(asctime)s]: %(message)s',
-    level=logging.INFO)
+from direct.showbase.MessengerGlobal import messenger
 
 
 class LoggerHandler(logging.Handler):
+    """
+    Keeps the last records for the debug window. They are sent once per frame, as a batch, by the ``log_events`` event
+    """
+    def __init__(self, capacity=1000):
+        super().__init__()
+        # appending to and popping from a deque is thread safe
+        self.records = deque(maxlen=capacity)
+
     def emit(self, record):
-        messenger.send('log_event', sentArgs=[record.levelname, record.message])
+        self.records.append((record.levelname, record.getMessage()))
+
+    def send_records(self, task):
+        if len(self.records) > 0:
+            records = []
+            while len(self.records) > 0:
+                records.append(self.records.popleft())
+            messenger.send('log_events', sentArgs=[records])
+        return task.cont
+
+
+_console_handler = logging.StreamHandler()
+_console_handler.setFormatter(logging.Formatter('%(levelname)s [%(asctime)s]: %(message)s'))
+_overlay_handler = LoggerHandler()
+_listener = None
+
+# records are written by the caller until the engine starts the background pipeline
+logging.getLogger().addHandler(_console_handler)
+logging.getLogger().setLevel(logging.INFO)
+
+
+def start_logging() -> None:
+    """
+    Write records from a background thread, and send them to the debug window once per frame. Called by the engine,
+    offline tools keep writing records from the caller
+    """
+    global _listener
+    if _listener is not None:
+        return
+    from direct.task.TaskManagerGlobal import taskMgr
+
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, _console_handler, _overlay_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+    taskMgr.add(_overlay_handler.send_records, 'log_events')
 
+    # messages are formatted by the caller, their arguments may change once the record is queued
+    logging.getLogger().removeHandler(_console_handler)
+    logging.getLogger().addHandler(QueueHandler(log_queue))
 
 Logger = logging
-Logger.getLogger().addHandler(LoggerHandler())
 Logger.title = logging.info
 Logger.print = logging.info
 
 Logger.set_log_level = Logger.getLogger().setLevel
+# cheap check to skip building messages that would not be logged
+Logger.is_enabled_for = Logger.getLogger().isEnabledFor
 
 # class Logger:
 #     colors = {'purple': '\033[95m',
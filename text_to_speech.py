@@ -1,17 +1,155 @@
-import logging
-from gtts import gTTS
+"""
+Synthesize voice lines offline with pyttsx3, in parallel. Voice lines are the rows of the text file whose key starts
+with ``voice_``: the text of the chosen language is written in ``<sfx_sound_folder>/<key>.wav``. An optional ``voice``
+column gives the pyttsx3 voice of a line, as a voice index, id or part of its name.
+
+Lines whose text, voice and engine did not change since their last synthesis are skipped, and files that were not
+written by this tool (e.g. recorded voices) are never overwritten unless ``--force`` is given. The sound manifest is
+updated with the new files.
 
-# This module is imported so that we can
-# play the converted audio
+Usage:
+    python text_to_speech.py [--lang fr] [--voice 1] [--rate 170] [--workers 4]
+"""
+import argparse
+import csv
+import hashlib
+import json
+import logging
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
 import pyttsx3
 
+from engine.sound.sound_manifest import SoundManifest
+from engine.utils.ini_parser import ParamUtils
+
+logging.basicConfig(level='INFO')
+
+# the pyttsx3 engine of a worker process, and its default voice
+_engine = None
+_default_voice = None
+
+
+def read_params() -> dict:
+    """
+    Read default parameters, overridden by the custom parameter file if it exists
+    """
+    params = ParamUtils.read_ini_file('params_default.ini')
+    if Path('params.ini').exists():
+        params.update(ParamUtils.read_ini_file('params.ini'))
+    return params
+
+
+def read_voice_lines(file_name: str, lang: str, default_voice: str) -> dict:
+    """
+    Read voice lines from the text file
+
+    Returns:
+        a :obj:`dict` from voice line names to their text and voice
+    """
+    lines = dict()
+    with open(file_name, 'r', encoding='utf-8', newline='') as file:
+        for row in csv.DictReader(file, delimiter=';'):
+            key = row.get('key', None) or ''
+            text = row.get(lang, None)
+            if key.startswith('voice_') and text:
+                lines[key] = (text, row.get('voice', None) or default_voice)
+    return lines
+
+
+def line_hash(text: str, voice: str, rate: int) -> str:
+    """
+    Hash of a voice line together with the voice and the engine used to synthesize it
+    """
+    return hashlib.sha1(json.dumps(['pyttsx3', sys.platform, voice, rate, text]).encode()).hexdigest()
+
+
+def _init_worker(rate: int) -> None:
+    global _engine, _default_voice
+    _engine = pyttsx3.init()
+    _engine.setProperty('rate', rate)
+    _default_voice = _engine.getProperty('voice')
+
+
+def _find_voice(voice: str):
+    voices = _engine.getProperty('voices')
+    if voice.isdigit() and int(voice) < len(voices):
+        return voices[int(voice)].id
+    for v in voices:
+        if voice == v.id or voice.lower() in v.name.lower():
+            return v.id
+    raise ValueError(f'no voice matching "{voice}"')
+
+
+def synthesize(text: str, voice: str, target: str) -> str:
+    """
+    Synthesize a voice line in a wav file. Executed in a worker process
+
+    Args:
+        text (str): the text
+        voice (str): a voice index, id or part of its name. ``None`` for the default voice
+        target (str): the wav file to write
+
+    Returns:
+        the target file
+    """
+    # a worker synthesizes many lines, the voice of a previous one must not be kept
+    _engine.setProperty('voice', _find_voice(voice) if voice is not None else _default_voice)
+    # write in a temporary file first, so that an interrupted synthesis is not seen as done
+    tmp = target.replace('.wav', '.tmp.wav')
+    _engine.save_to_file(text, tmp)
+    _engine.runAndWait()
+    os.replace(tmp, target)
+    return target
+
+
 if __name__ == '__main__':
-    engine = pyttsx3.init()
-    text = "Bonjour équipage Equality. Je suis Kora, votre IA de bord. Tous les systèmes sont en ligne, nous pouvons " \
-           "amorcer la procédure de démarrage"
-    voices = engine.getProperty("voices")
-    engine.setProperty("voice", voices[1].id)
-    engine.say(text)
-    # play the speech
-    engine.runAndWait()
+    params = read_params()
+    parser = argparse.ArgumentParser(description='Synthesize voice lines of the text file')
+    parser.add_argument('--lang', default=params['lang'], help='language of the voice lines')
+    parser.add_argument('--voice', default=None, help='default voice, as an index, id or part of its name')
+    parser.add_argument('--rate', type=int, default=170, help='speech rate, in words per minute')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--force', action='store_true', help='overwrite files not written by this tool')
+    parser.add_argument('--cache', default='data/sound/tts_cache.json', help='hashes of synthesized lines')
+    args = parser.parse_args()
+
+    cache = dict()
+    if os.path.exists(args.cache):
+        with open(args.cache, 'r') as f:
+            cache = json.load(f)
+
+    folder = params['sfx_sound_folder']
+    todo = []
+    for name, (text, voice) in read_voice_lines(params['text_file'], args.lang, args.voice).items():
+        target = os.path.join(folder, name + '.wav')
+        h = line_hash(text, voice, args.rate)
+        if os.path.exists(target):
+            if cache.get(target, None) == h:
+                continue
+            if target not in cache and not args.force:
+                logging.warning(f'"{target}" was not synthesized by this tool, skipping it (use --force)')
+                continue
+        todo.append((text, voice, target, h))
+    logging.info(f'{len(todo)} voice lines to synthesize')
+
+    manifest = SoundManifest(params['sound_manifest_file'])
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(args.rate, )) as pool:
+        futures = {pool.submit(synthesize, text, voice, target): (target, h) for text, voice, target, h in todo}
+        for future in as_completed(futures):
+            target, h = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                logging.error(f'cannot synthesize "{target}": {e}')
+                continue
+            logging.info(f'"{target}" written')
+            cache[target] = h
+            manifest.update(target)
+
+    with open(args.cache, 'w') as f:
+        json.dump(cache, f, indent=1)
+    manifest.save()
+    logging.info('all done')